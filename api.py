@@ -0,0 +1,206 @@
+import hashlib
+import json
+from datetime import datetime
+
+from flask import Blueprint, Response, abort, jsonify, request, stream_with_context
+from sqlalchemy import func, select
+
+from models import db, Show, Venue, Artist
+
+api = Blueprint('api_v1', __name__, url_prefix='/api/v1')
+
+# Rows are pulled from the database cursor in batches of this size
+YIELD_PER = 500
+
+VENUE_FIELDS = {
+    name: getattr(Venue, name) for name in (
+        'id', 'name', 'genres', 'city', 'state', 'address', 'phone', 'website',
+        'facebook_link', 'seeking_talent', 'seeking_description', 'image_link',
+        'upcoming_shows_count', 'past_shows_count',
+    )
+}
+
+ARTIST_FIELDS = {
+    name: getattr(Artist, name) for name in (
+        'id', 'name', 'genres', 'city', 'state', 'phone', 'website',
+        'facebook_link', 'seeking_venue', 'seeking_description', 'image_link',
+        'upcoming_shows_count', 'past_shows_count',
+    )
+}
+
+SHOW_FIELDS = {
+    'id': Show.id,
+    'start_time': Show.start_time,
+    'artist_id': Show.artist_id,
+    'venue_id': Show.venue_id,
+    'artist_name': Artist.name,
+    'artist_image_link': Artist.image_link,
+    'venue_name': Venue.name,
+    'venue_image_link': Venue.image_link,
+}
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def _dumps(value):
+    return json.dumps(value, default=_json_default, separators=(',', ':'))
+
+
+def _selected_fields(available):
+    # ?fields=id,name restricts the columns that are queried and returned
+    fields = request.args.get('fields')
+    if not fields:
+        return list(available)
+    fields = [field.strip() for field in fields.split(',') if field.strip()]
+    unknown = [field for field in fields if field not in available]
+    if unknown:
+        abort(400, f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+
+def _page_args():
+    try:
+        cursor = int(request.args['cursor']) if 'cursor' in request.args else None
+        limit = int(request.args['limit']) if 'limit' in request.args else None
+    except ValueError:
+        abort(400, 'cursor and limit must be integers')
+    if limit is not None and limit < 1:
+        abort(400, 'limit must be positive')
+    return cursor, limit
+
+
+def _collection_etag(*models):
+    # Weak validator from row counts, highest ids and latest updates,
+    # fetched in one statement
+    subqueries = []
+    for model in models:
+        subqueries.append(select(func.count(model.id)).scalar_subquery())
+        subqueries.append(select(func.max(model.id)).scalar_subquery())
+        subqueries.append(select(func.max(model.updated_at)).scalar_subquery())
+    version = db.session.query(*subqueries).one()
+    key = f'{request.full_path}|' + '|'.join(str(value) for value in version)
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def _not_modified(etag):
+    return request.if_none_match.contains_weak(etag)
+
+
+def _stream(query, id_column, fields, etag):
+    cursor, limit = _page_args()
+    if cursor is not None:
+        query = query.filter(id_column > cursor)
+    query = query.order_by(id_column)
+    if limit is not None:
+        query = query.limit(limit + 1)
+
+    def generate():
+        # Encode row by row so memory stays flat for full exports
+        yield '{"data":['
+        count = 0
+        last_id = None
+        next_cursor = None
+        for row in query.yield_per(YIELD_PER):
+            if limit is not None and count == limit:
+                next_cursor = last_id
+                break
+            item = {field: getattr(row, field) for field in fields}
+            yield (',' if count else '') + _dumps(item)
+            last_id = row._cursor_id
+            count += 1
+        yield '],"next_cursor":' + _dumps(next_cursor) + '}'
+
+    response = Response(stream_with_context(generate()), mimetype='application/json')
+    response.set_etag(etag, weak=True)
+    return response
+
+
+def _list(model, available, *etag_models):
+    fields = _selected_fields(available)
+    etag = _collection_etag(*etag_models)
+    if _not_modified(etag):
+        return Response(status=304)
+
+    query = db.session.query(
+        *[available[field].label(field) for field in fields],
+        model.id.label('_cursor_id')
+    ).select_from(model)
+    if model is Show:
+        if any(field in fields for field in ('artist_name', 'artist_image_link')):
+            query = query.join(Artist, Show.artist_id == Artist.id)
+        if any(field in fields for field in ('venue_name', 'venue_image_link')):
+            query = query.join(Venue, Show.venue_id == Venue.id)
+    return _stream(query, model.id, fields, etag)
+
+
+def _detail(record, available, shows):
+    fields = _selected_fields(available)
+    data = {field: getattr(record, field) for field in fields}
+    data['shows'] = [dict(show._mapping) for show in shows]
+
+    response = Response(_dumps(data), mimetype='application/json')
+    response.add_etag(weak=True)
+    return response.make_conditional(request)
+
+
+@api.route('/venues')
+def venues():
+    return _list(Venue, VENUE_FIELDS, Venue)
+
+
+@api.route('/artists')
+def artists():
+    return _list(Artist, ARTIST_FIELDS, Artist)
+
+
+@api.route('/shows')
+def shows():
+    return _list(Show, SHOW_FIELDS, Show, Venue, Artist)
+
+
+@api.route('/venues/<int:venue_id>')
+def venue(venue_id):
+    record = Venue.query.get_or_404(venue_id)
+    shows_in_db = db.session.query(
+        Show.id, Show.start_time, Artist.id.label('artist_id'), Artist.name.label('artist_name')
+    ).join(Artist, Show.artist_id == Artist.id).filter(
+        Show.venue_id == venue_id
+    ).order_by(Show.start_time).all()
+    return _detail(record, VENUE_FIELDS, shows_in_db)
+
+
+@api.route('/artists/<int:artist_id>')
+def artist(artist_id):
+    record = Artist.query.get_or_404(artist_id)
+    shows_in_db = db.session.query(
+        Show.id, Show.start_time, Venue.id.label('venue_id'), Venue.name.label('venue_name')
+    ).join(Venue, Show.venue_id == Venue.id).filter(
+        Show.artist_id == artist_id
+    ).order_by(Show.start_time).all()
+    return _detail(record, ARTIST_FIELDS, shows_in_db)
+
+
+@api.route('/shows/<int:show_id>')
+def show(show_id):
+    row = db.session.query(
+        *[column.label(field) for field, column in SHOW_FIELDS.items()]
+    ).select_from(Show).join(Artist, Show.artist_id == Artist.id).join(
+        Venue, Show.venue_id == Venue.id
+    ).filter(Show.id == show_id).first()
+    if row is None:
+        abort(404)
+
+    fields = _selected_fields(SHOW_FIELDS)
+    response = Response(_dumps({field: getattr(row, field) for field in fields}), mimetype='application/json')
+    response.add_etag(weak=True)
+    return response.make_conditional(request)
+
+
+@api.errorhandler(400)
+@api.errorhandler(404)
+def api_error(error):
+    return jsonify({'error': error.description}), error.code
@@ -0,0 +1,261 @@
+import sys
+from datetime import datetime
+
+from flask import Blueprint, jsonify, render_template, request, flash, redirect, url_for
+from sqlalchemy import func, select
+
+from autocomplete import artist_index
+from conditional import conditional
+from forms import ArtistForm
+from models import cache, db, Artist, Show, Venue
+from replicas import replica_reads
+from search import filter_genres, genre_facets, requested_genres, search_records
+
+blueprint = Blueprint('artists', __name__)
+
+# Page versions for conditional GET, each read in a single statement. The
+# next upcoming start time is included because a page changes when that
+# show moves into the past.
+def artists_page_version():
+  values = db.session.query(
+    select(func.count(Artist.id)).scalar_subquery(),
+    select(func.max(Artist.updated_at)).scalar_subquery()
+  ).one()
+  return values
+
+def artist_page_version(artist_id):
+  artist_shows = Show.artist_id == artist_id
+  values = db.session.query(
+    select(Artist.updated_at).where(Artist.id == artist_id).scalar_subquery(),
+    select(func.count(Show.id)).where(artist_shows).scalar_subquery(),
+    select(func.max(Show.updated_at)).where(artist_shows).scalar_subquery(),
+    select(func.max(Venue.updated_at)).join(Show, Show.venue_id == Venue.id).where(artist_shows).scalar_subquery(),
+    select(func.min(Show.start_time)).where(artist_shows, Show.upcoming(datetime.now())).scalar_subquery()
+  ).one()
+  if values[0] is None:
+    return None
+  return values
+
+# Get Artists
+@blueprint.route('/artists') 
+@replica_reads
+@conditional(artists_page_version)
+@cache.cached('artists')
+def artists():
+
+  # Query Table to Get Artists, optionally filtered by genre
+  genres, match = requested_genres()
+  artists_in_db = filter_genres(Artist.query, Artist, genres, match).order_by('id').all()
+  data=[]
+
+  # Create data for front end
+  for artist in artists_in_db:
+    artist_id = artist.id
+    artist_name = artist.name
+    artist_data = {"id" : artist_id, "name" : artist_name}
+    data.append(artist_data)
+
+  # Send data to front end
+  return render_template('pages/artists.html', artists=data,
+    facets=genre_facets(Artist, genres, match), selected_genres=genres, match=match)
+
+# Search Through Artists
+@blueprint.route('/artists/search', methods=['POST']) 
+@replica_reads
+@cache.cached('artists', 'shows')
+def search_artists():
+
+  # Fetch search term from front end
+  search_term = request.form.get('search_term', '')
+
+  # Query artists by name, city or state, best matches first
+  genres, match = requested_genres()
+  artist_in_db = search_records(Artist, search_term, genres, match)
+
+  # Build the response with the count and matched venues
+  response = {
+    "count": len(artist_in_db),
+    "data": []
+  }
+
+  # Create data to send to front end
+  for artist in artist_in_db:
+    response["data"].append({
+      "id": artist.id,
+      "name": artist.name,
+      "num_upcoming_shows": artist.upcoming_shows_count
+    })
+
+  # Send Data to front end
+  return render_template('pages/search_artists.html', results=response, search_term=request.form.get('search_term', ''),
+    facets=genre_facets(Artist, genres, match, search_term), selected_genres=genres, match=match)
+
+# Autocomplete artist names for the show form
+@blueprint.route('/artists/autocomplete')
+def autocomplete_artists():
+  prefix = request.args.get('q', '').strip()
+  return jsonify({"data": artist_index.search(prefix) if prefix else []})
+
+# Get artist by ID
+@blueprint.route('/artists/<int:artist_id>') 
+@replica_reads
+@conditional(artist_page_version)
+@cache.cached('artist:{artist_id}')
+def show_artist(artist_id):
+
+  # Fetch the artist By ID
+  artist = Artist.query.get_or_404(artist_id)
+
+  # Fetch all shows with only the venue columns the page needs
+  shows_in_db = db.session.query(
+    Venue.id, Venue.name, Venue.image_link, Show.start_time
+  ).join(Venue, Show.venue_id == Venue.id).filter(
+    Show.artist_id == artist_id
+  ).order_by(Show.start_time).all()
+
+  # Split shows into past and upcoming
+  now = datetime.now()
+  past_shows_data = []
+  upcoming_shows_data = []
+  for venue_id, venue_name, venue_image_link, start_time in shows_in_db:
+    cache.tag(f'venue:{venue_id}')
+    data = {
+      "venue_id": venue_id,
+      "venue_name": venue_name,
+      "venue_image_link": venue_image_link,
+      "start_time": start_time
+    }
+    if start_time < now:
+      past_shows_data.append(data)
+    else:
+      upcoming_shows_data.append(data)
+
+  artist_data = {
+      "id" : artist.id,
+      "name" : artist.name,
+      "genres" : artist.genres,
+      "city" : artist.city,
+      "state" : artist.state,
+      "phone" : artist.phone,
+      "website" : artist.website,
+      "facebook_link" : artist.facebook_link,
+      "seeking_venue" : artist.seeking_venue,
+      "seeking_description" : artist.seeking_description,
+      "image_link" : artist.image_link,
+      "past_shows" : past_shows_data,
+      "upcoming_shows" : upcoming_shows_data,
+      "past_shows_count": len(past_shows_data),
+      "upcoming_shows_count": len(upcoming_shows_data)
+    }
+
+  return render_template('pages/show_artist.html', artist=artist_data)
+
+#  Update artist Info
+@blueprint.route('/artists/<int:artist_id>/edit', methods=['GET']) 
+def edit_artist(artist_id):
+
+  # Fetch Artists from DB
+  artist = Artist.query.get(artist_id)
+  form = ArtistForm(obj=artist)
+
+  # Pass artist details as a dictionary for rendering the template
+  artist_data = {
+    "id": artist.id,
+    "name": artist.name,
+    "genres": artist.genres,
+    "city": artist.city,
+    "state": artist.state,
+    "phone": artist.phone,
+    "website": artist.website,
+    "facebook_link": artist.facebook_link,
+    "seeking_venue": artist.seeking_venue,
+    "seeking_description": artist.seeking_description,
+    "image_link": artist.image_link,
+  }
+  return render_template('forms/edit_artist.html', form=form, artist=artist_data)
+
+#  Update artist Info
+@blueprint.route('/artists/<int:artist_id>/edit', methods=['POST']) 
+def edit_artist_submission(artist_id):
+  form = ArtistForm(request.form)
+  if form.validate():
+    try:
+      # Get Artist and Update Info
+      artist = Artist.query.get(artist_id)
+      artist.name = form.name.data
+      artist.city = form.city.data
+      artist.state = form.state.data
+      artist.phone = form.phone.data
+      artist.genres = form.genres.data
+      artist.facebook_link = form.facebook_link.data
+      artist.image_link = form.image_link.data
+      artist.website = form.website_link.data
+      artist.seeking_venue = form.seeking_venue.data
+      artist.seeking_description = form.seeking_description.data
+
+      # commit those changes to DB
+      db.session.commit()
+      flash('Artist Info Was Updated')
+      cache.invalidate('artists', f'artist:{artist_id}')
+      artist_index.upsert(artist_id, form.name.data)
+
+    except Exception as e:
+      db.session.rollback()
+      flash('An error occurred. Artist could not be updated.')
+      print(f"Error: {e}")
+
+    finally:
+      db.session.close()
+  else:
+    for field_name, error_messages in form.errors.items():
+      for error in error_messages:
+        flash(f"Error in {field_name}: {error}")
+    return redirect(url_for('artists.edit_artist', artist_id=artist_id))
+
+  return redirect(url_for('artists.show_artist', artist_id=artist_id))
+
+#  Create Artist
+@blueprint.route('/artists/create', methods=['GET']) 
+def create_artist_form():
+  form = ArtistForm()
+  return render_template('forms/new_artist.html', form=form)
+
+#  Create Artist
+@blueprint.route('/artists/create', methods=['POST']) 
+def create_artist_submission():
+  form = ArtistForm(request.form)
+  if form.validate():
+    try:
+      artist = Artist(
+        name=form.name.data,
+        city=form.city.data,
+        state=form.state.data,
+        phone=form.phone.data,
+        genres=form.genres.data,
+        website=form.website_link.data,
+        seeking_venue=form.seeking_venue.data,
+        seeking_description=form.seeking_description.data,
+        image_link=form.image_link.data,
+        facebook_link=form.facebook_link.data
+      )
+
+      # Add artist to the database
+      db.session.add(artist)
+      db.session.commit()
+      cache.invalidate('artists')
+      artist_index.upsert(artist.id, artist.name)
+      flash('Artist successfully listed!')
+    except:
+      db.session.rollback()
+      print(sys.exc_info())
+      flash('An error occurred. Artist could not be listed.')
+    finally:
+      db.session.close()
+  else:
+    for field_name, error_messages in form.errors.items():
+      for error in error_messages:
+        flash(f"Error in {field_name}: {error}")
+    return redirect(url_for('artists.create_artist_form'))
+
+  return redirect(url_for('index'))
+
@@ -0,0 +1,188 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import posixpath
+import re
+
+import click
+from flask import current_app, request, send_from_directory, url_for
+from flask.cli import AppGroup
+from werkzeug.exceptions import NotFound
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+assets_cli = AppGroup('assets', help='Build the bundled static assets.')
+
+# Bundle name -> source files under static/, in load order
+BUNDLES = {
+    'site.css': [
+        'css/bootstrap.min.css',
+        'css/layout.main.css',
+        'css/main.css',
+        'css/main.responsive.css',
+        'css/main.quickfix.css',
+    ],
+    'head.js': [
+        'js/libs/modernizr-2.8.2.min.js',
+        'js/libs/moment.min.js',
+    ],
+    'site.js': [
+        'js/libs/bootstrap-3.1.1.min.js',
+        'js/plugins.js',
+        'js/script.js',
+    ],
+}
+
+DIST_DIR = 'dist'
+MANIFEST = 'manifest.json'
+
+# Precompressed variants, in order of preference
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+_CSS_COMMENT = re.compile(r'/\*(?!!).*?\*/', re.S)
+_CSS_SPACE = re.compile(r'\s+')
+_CSS_PUNCTUATION = re.compile(r'\s*([{};,>])\s*')
+_CSS_URL = re.compile(r'''url\(\s*(['"]?)([^'")]+)\1\s*\)''')
+_SOURCE_MAP = re.compile(r'^//[#@] sourceMappingURL=.*$', re.M)
+
+_manifest = {'mtime': None, 'entries': {}}
+
+
+def _dist_path(app, *parts):
+    return os.path.join(app.static_folder, DIST_DIR, *parts)
+
+
+def _rebase_urls(css, source, static_url):
+    # Bundles are served from /assets/, so url() references relative to the
+    # source stylesheet are rewritten to absolute /static/ paths
+    base = posixpath.join(static_url, posixpath.dirname(source))
+
+    def rebase(match):
+        quote, ref = match.groups()
+        if ref.startswith(('data:', 'http:', 'https:', '//', '/', '#')):
+            return match.group(0)
+        return f'url({quote}{posixpath.normpath(posixpath.join(base, ref))}{quote})'
+
+    return _CSS_URL.sub(rebase, css)
+
+
+def minify_css(css):
+    css = _CSS_COMMENT.sub('', css)
+    css = _CSS_SPACE.sub(' ', css)
+    css = _CSS_PUNCTUATION.sub(r'\1', css)
+    return css.replace(';}', '}').strip()
+
+
+def _read(app, source):
+    with open(os.path.join(app.static_folder, source), encoding='utf-8') as f:
+        return f.read()
+
+
+def bundle_contents(app, bundle):
+    sources = BUNDLES[bundle]
+    if bundle.endswith('.css'):
+        return minify_css(''.join(
+            _rebase_urls(_read(app, source), source, app.static_url_path) for source in sources
+        ))
+    # Scripts are concatenated as-is (the libraries ship minified); the
+    # separator keeps a file without a trailing semicolon from running
+    # into the next one
+    return ';\n'.join(_SOURCE_MAP.sub('', _read(app, source)).strip() for source in sources) + '\n'
+
+
+def _write(path, data):
+    # Write next to the target and rename so readers never see a partial file
+    partial = path + '.partial'
+    with open(partial, 'wb') as f:
+        f.write(data)
+    os.replace(partial, path)
+
+
+def build_assets(app):
+    os.makedirs(_dist_path(app), exist_ok=True)
+    entries = {}
+    for bundle in BUNDLES:
+        data = bundle_contents(app, bundle).encode('utf-8')
+        name, ext = os.path.splitext(bundle)
+        filename = f'{name}.{hashlib.sha256(data).hexdigest()[:12]}{ext}'
+        path = _dist_path(app, filename)
+        _write(path, data)
+        _write(path + '.gz', gzip.compress(data, compresslevel=9, mtime=0))
+        if brotli is not None:
+            _write(path + '.br', brotli.compress(data, quality=11))
+        entries[bundle] = filename
+    _write(_dist_path(app, MANIFEST), json.dumps(entries, indent=2, sort_keys=True).encode('utf-8'))
+    return entries
+
+
+def _manifest_entries(app):
+    # Reloaded when a new build replaces the manifest
+    try:
+        mtime = os.stat(_dist_path(app, MANIFEST)).st_mtime_ns
+    except FileNotFoundError:
+        return {}
+    if mtime != _manifest['mtime']:
+        with open(_dist_path(app, MANIFEST), encoding='utf-8') as f:
+            _manifest['entries'] = json.load(f)
+        _manifest['mtime'] = mtime
+    return _manifest['entries']
+
+
+def asset_urls(bundle):
+    # URLs to include for a bundle: the hashed build when there is one,
+    # otherwise its source files
+    app = current_app
+    if app.config['ASSETS_BUNDLED']:
+        filename = _manifest_entries(app).get(bundle)
+        if filename is not None:
+            return [url_for('assets', filename=filename)]
+    return [url_for('static', filename=source) for source in BUNDLES[bundle]]
+
+
+def serve_asset(filename):
+    # Hashed names never change content, so responses are cacheable forever
+    directory = _dist_path(current_app)
+    if filename == MANIFEST or filename.endswith(tuple(suffix for _, suffix in ENCODINGS)):
+        raise NotFound()
+    path = safe_join(directory, filename)
+    if path is None or not os.path.isfile(path):
+        raise NotFound()
+
+    served, encoding = filename, None
+    for name, suffix in ENCODINGS:
+        if request.accept_encodings[name] and os.path.isfile(path + suffix):
+            served, encoding = filename + suffix, name
+            break
+
+    max_age = current_app.config['ASSETS_MAX_AGE']
+    response = send_from_directory(
+        directory, served, mimetype=mimetypes.guess_type(filename)[0], max_age=max_age
+    )
+    if encoding is not None:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
+def init_assets(app):
+    app.add_url_rule('/assets/<path:filename>', 'assets', serve_asset)
+    app.jinja_env.globals['asset_urls'] = asset_urls
+
+
+@assets_cli.command('build')
+def build_command():
+    """Bundle, minify, hash and precompress the CSS and JS."""
+    entries = build_assets(current_app)
+    for bundle, filename in sorted(entries.items()):
+        click.echo(f'{bundle} -> {DIST_DIR}/{filename}')
+    if brotli is None:
+        click.echo('brotli is not installed; only gzip variants were written.')
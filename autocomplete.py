@@ -0,0 +1,78 @@
+import threading
+import time
+from bisect import bisect_left, insort
+
+from flask import current_app
+
+from models import db, Artist, Venue
+
+
+class PrefixIndex:
+    # Names kept in memory as sorted (lowercased name, id, name) tuples so a
+    # prefix lookup is a binary search. Writes in this process update it
+    # incrementally; a full rebuild every AUTOCOMPLETE_MAX_AGE seconds picks
+    # up changes made by other workers.
+
+    def __init__(self, model):
+        self.model = model
+        self._entries = []
+        self._keys = {}
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def rebuild(self):
+        rows = db.session.query(self.model.id, self.model.name).all()
+        entries = sorted((name.lower(), record_id, name) for record_id, name in rows if name)
+        with self._lock:
+            self._entries = entries
+            self._keys = {record_id: (key, record_id, name) for key, record_id, name in entries}
+            self._loaded_at = time.monotonic()
+
+    def invalidate(self):
+        self._loaded_at = None
+
+    def _ensure_fresh(self):
+        max_age = current_app.config.get('AUTOCOMPLETE_MAX_AGE', 300)
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > max_age:
+            self.rebuild()
+
+    def _remove(self, record_id):
+        entry = self._keys.pop(record_id, None)
+        if entry is not None:
+            index = bisect_left(self._entries, entry)
+            if index < len(self._entries) and self._entries[index] == entry:
+                del self._entries[index]
+
+    def upsert(self, record_id, name):
+        if self._loaded_at is None:
+            return
+        with self._lock:
+            self._remove(record_id)
+            if name:
+                entry = (name.lower(), record_id, name)
+                insort(self._entries, entry)
+                self._keys[record_id] = entry
+
+    def remove(self, record_id):
+        if self._loaded_at is None:
+            return
+        with self._lock:
+            self._remove(record_id)
+
+    def search(self, prefix, limit=10):
+        self._ensure_fresh()
+        key = prefix.lower()
+        matches = []
+        with self._lock:
+            index = bisect_left(self._entries, (key,))
+            while index < len(self._entries) and len(matches) < limit:
+                name_key, record_id, name = self._entries[index]
+                if not name_key.startswith(key):
+                    break
+                matches.append({'id': record_id, 'name': name})
+                index += 1
+        return matches
+
+
+artist_index = PrefixIndex(Artist)
+venue_index = PrefixIndex(Venue)
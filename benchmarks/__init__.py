@@ -0,0 +1 @@
+# Seeding and load-test tooling; see benchmarks/run.py for usage.
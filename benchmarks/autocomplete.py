@@ -0,0 +1,49 @@
+# Compare the in-memory prefix index against the equivalent ILIKE query.
+#
+#   python -m benchmarks.autocomplete --prefixes 500
+import argparse
+import random
+import time
+
+from sqlalchemy import event
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark name autocomplete.')
+    parser.add_argument('--prefixes', type=int, default=500, help='number of lookups per implementation')
+    parser.add_argument('--limit', type=int, default=10)
+    args = parser.parse_args()
+
+    from app import create_app
+    from autocomplete import artist_index
+    from models import db, Artist
+
+    app = create_app()
+    with app.app_context():
+        names = [name for (name,) in db.session.query(Artist.name).filter(Artist.name.isnot(None))]
+        if not names:
+            parser.error('the database has no artists; seed it with python -m benchmarks.run --seed')
+        rng = random.Random(0)
+        prefixes = [name[:rng.randint(1, min(len(name), 6))] for name in rng.choices(names, k=args.prefixes)]
+
+        artist_index.rebuild()
+        started = time.perf_counter()
+        for prefix in prefixes:
+            artist_index.search(prefix, args.limit)
+        index_time = (time.perf_counter() - started) / len(prefixes)
+
+        statements = [0]
+        event.listen(db.engine, 'before_cursor_execute', lambda *a: statements.__setitem__(0, statements[0] + 1))
+        started = time.perf_counter()
+        for prefix in prefixes:
+            db.session.query(Artist.id, Artist.name).filter(
+                Artist.name.ilike(f'{prefix}%')
+            ).order_by(Artist.name).limit(args.limit).all()
+        query_time = (time.perf_counter() - started) / len(prefixes)
+
+    print(f'prefix index: {index_time * 1e6:.1f} us/lookup, 0 queries')
+    print(f'ilike query:  {query_time * 1e6:.1f} us/lookup, {statements[0] / len(prefixes):.0f} queries/lookup')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+# Per-row cost of the show datetime filter: the old path, where routes
+# passed str(start_time) and the filter re-parsed it with dateutil and
+# formatted it with a pattern string, against the current
+# app.format_datetime, which takes the datetime and caches the result.
+#
+#   python -m benchmarks.formatting --rows 2000 --repeat 5
+#
+# "cold" clears the cache before every pass, as on the first render of a
+# page; "warm" renders the same rows again, as on later renders.
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+import babel.dates
+import dateutil.parser
+
+OLD_PATTERNS = {'full': "EEEE MMMM, d, y 'at' h:mma", 'medium': "EE MM, dd, y h:mma"}
+
+
+def old_format_datetime(value, format_='medium'):
+    date = dateutil.parser.parse(value)
+    return babel.dates.format_datetime(date, OLD_PATTERNS[format_], locale='en')
+
+
+def start_times(rows, rng):
+    # Shows start on the hour or half hour over the year either side of now
+    now = datetime.now().replace(minute=0, second=0, microsecond=0)
+    return [now + timedelta(minutes=30 * rng.randint(-17520, 17520)) for _ in range(rows)]
+
+
+def time_pass(format_row, values, format_):
+    started = time.perf_counter()
+    for value in values:
+        format_row(value, format_)
+    return (time.perf_counter() - started) / len(values)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark per-row datetime formatting.')
+    parser.add_argument('--rows', type=int, default=2000, help='start times per pass; above the cache size warm passes miss too')
+    parser.add_argument('--repeat', type=int, default=5, help='passes per variant; the median is reported')
+    parser.add_argument('--format', default='medium', choices=sorted(OLD_PATTERNS))
+    args = parser.parse_args()
+
+    from app import _format_datetime, format_datetime
+
+    values = start_times(args.rows, random.Random(0))
+    strings = [str(value) for value in values]
+    assert [old_format_datetime(value, args.format) for value in strings[:100]] == \
+        [format_datetime(value, args.format) for value in values[:100]]
+
+    def cold():
+        _format_datetime.cache_clear()
+        return time_pass(format_datetime, values, args.format)
+
+    old = statistics.median(time_pass(old_format_datetime, strings, args.format) for _ in range(args.repeat))
+    current_cold = statistics.median(cold() for _ in range(args.repeat))
+    current_warm = statistics.median(time_pass(format_datetime, values, args.format) for _ in range(args.repeat))
+
+    print(f'str -> dateutil -> babel:     {old * 1e6:8.2f} us/row')
+    print(f'format_datetime, cold cache:  {current_cold * 1e6:8.2f} us/row  ({old / current_cold:.1f}x)')
+    print(f'format_datetime, warm cache:  {current_warm * 1e6:8.2f} us/row  ({old / current_warm:.1f}x)')
+    print(f'({args.rows} rows, {args.format} format, median of {args.repeat} passes; '
+          f'the cache keeps {_format_datetime.cache_info().maxsize} entries)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,318 @@
+# Drive every route of the app and report latency, throughput and SQL
+# statement counts per route as JSON.
+#
+#   python -m benchmarks.run --seed --venues 1000 --artists 1000 --shows 20000
+#   python -m benchmarks.run --url http://127.0.0.1:5000 --concurrency 16
+#
+# Without --url routes are called in-process through the Flask test client,
+# which also counts SQL statements. With --url the routes that do not write
+# are additionally driven over HTTP by a thread pool against a running server.
+#
+# Runs at different commits are comparable: --seed drops and recreates the
+# tables before seeding (point DATABASE_URL at a throwaway database), write
+# routes only touch scratch rows that are deleted after each route, and ids,
+# cursors and form data are drawn from a generator seeded with --random-seed.
+import argparse
+import json
+import os
+import random
+import subprocess
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+VENUE_FORM = {
+    'name': 'Benchmark Venue', 'city': 'New York', 'state': 'NY', 'address': '1 Main Street',
+    'phone': '555-555-5555', 'genres': 'Jazz', 'website_link': 'https://venue.example.com',
+    'facebook_link': 'https://www.facebook.com/venue', 'image_link': '', 'seeking_description': '',
+}
+
+ARTIST_FORM = {
+    'name': 'Benchmark Artist', 'city': 'New York', 'state': 'NY', 'phone': '555-555-5555',
+    'genres': 'Jazz', 'website_link': 'https://artist.example.com',
+    'facebook_link': 'https://www.facebook.com/artist', 'image_link': '', 'seeking_description': '',
+}
+
+
+# Reseeded by main() before each run
+RNG = random.Random(0)
+
+
+def show_form(ids):
+    start_time = datetime.now() + timedelta(days=RNG.uniform(1, 365))
+    return {'artist_id': ids['artist_id'], 'venue_id': ids['venue_id'],
+            'start_time': start_time.strftime('%Y-%m-%d %H:%M:%S')}
+
+
+def _scratch_record(model, form):
+    from models import db
+    record = model(**{**{key: value for key, value in form.items() if key not in ('website_link', 'genres')},
+                      'website': form['website_link'], 'genres': ['Jazz']})
+    db.session.add(record)
+    db.session.commit()
+    return record.id
+
+
+def scratch_venue(ids):
+    # Fresh venue without shows for the write routes
+    from models import Venue
+    return {'venue_id': _scratch_record(Venue, VENUE_FORM)}
+
+
+def scratch_artist(ids):
+    from models import Artist
+    return {'artist_id': _scratch_record(Artist, ARTIST_FORM)}
+
+
+def scratch_pair(ids):
+    return {**scratch_venue(ids), **scratch_artist(ids)}
+
+
+def remove_scratch_rows(db, seeded):
+    # Delete everything created after seeding, so every route reads the
+    # seeded data only
+    from autocomplete import artist_index, venue_index
+    from models import cache, Artist, Show, Venue
+    db.session.query(Show).filter(
+        (Show.id > seeded['show']) | (Show.venue_id > seeded['venue']) | (Show.artist_id > seeded['artist'])
+    ).delete(synchronize_session=False)
+    db.session.query(Venue).filter(Venue.id > seeded['venue']).delete(synchronize_session=False)
+    db.session.query(Artist).filter(Artist.id > seeded['artist']).delete(synchronize_session=False)
+    db.session.commit()
+    cache.invalidate('venues', 'artists', 'shows')
+    venue_index.invalidate()
+    artist_index.invalidate()
+
+
+# (name, method, path, form data, setup); path and data may use the ids of
+# a random existing venue and artist, a /shows cursor and a built asset.
+# Setups replace the ids with scratch rows for the routes that write.
+ROUTES = [
+    ('index', 'GET', '/', None, None),
+    ('venues', 'GET', '/venues', None, None),
+    ('search_venues', 'POST', '/venues/search', lambda ids: {'search_term': 'Venue 1'}, None),
+    ('venue_autocomplete', 'GET', '/venues/autocomplete?q=Venue+1', None, None),
+    ('show_venue', 'GET', '/venues/{venue_id}', None, None),
+    ('create_venue_form', 'GET', '/venues/create', None, None),
+    ('create_venue_submission', 'POST', '/venues/create', lambda ids: VENUE_FORM, None),
+    ('edit_venue', 'GET', '/venues/{venue_id}/edit', None, None),
+    ('edit_venue_submission', 'POST', '/venues/{venue_id}/edit', lambda ids: VENUE_FORM, scratch_venue),
+    ('delete_venue', 'DELETE', '/venues/{venue_id}', None, scratch_venue),
+    ('artists', 'GET', '/artists', None, None),
+    ('search_artists', 'POST', '/artists/search', lambda ids: {'search_term': 'Artist 1'}, None),
+    ('show_artist', 'GET', '/artists/{artist_id}', None, None),
+    ('create_artist_form', 'GET', '/artists/create', None, None),
+    ('create_artist_submission', 'POST', '/artists/create', lambda ids: ARTIST_FORM, None),
+    ('edit_artist', 'GET', '/artists/{artist_id}/edit', None, None),
+    ('edit_artist_submission', 'POST', '/artists/{artist_id}/edit', lambda ids: ARTIST_FORM, scratch_artist),
+    ('artist_autocomplete', 'GET', '/artists/autocomplete?q=Artist+1', None, None),
+    ('shows', 'GET', '/shows', None, None),
+    ('shows_next_page', 'GET', '/shows?cursor={cursor}', None, None),
+    ('create_shows', 'GET', '/shows/create', None, None),
+    ('create_show_submission', 'POST', '/shows/create', show_form, scratch_pair),
+    ('api_venues', 'GET', '/api/v1/venues?limit=100', None, None),
+    ('api_artists', 'GET', '/api/v1/artists?limit=100', None, None),
+    ('api_shows', 'GET', '/api/v1/shows?limit=100', None, None),
+    ('api_venue', 'GET', '/api/v1/venues/{venue_id}', None, None),
+    ('api_artist', 'GET', '/api/v1/artists/{artist_id}', None, None),
+    ('cache_stats', 'GET', '/cache/stats', None, None),
+    ('metrics', 'GET', '/metrics', None, None),
+    ('asset', 'GET', '/assets/{asset}', None, None),
+]
+
+# Routes that change data; they post WTForms forms, which a running server
+# checks for a CSRF token
+WRITE_ROUTES = {
+    'create_venue_submission', 'edit_venue_submission', 'delete_venue',
+    'create_artist_submission', 'edit_artist_submission', 'create_show_submission',
+}
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def summarize(latencies, elapsed):
+    return {
+        'requests': len(latencies),
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'throughput_rps': len(latencies) / elapsed if elapsed else None,
+    }
+
+
+def random_ids(choices):
+    # One random value for each of venue_id, artist_id, cursor, asset
+    return {name: RNG.choice(values) for name, values in choices.items() if values}
+
+
+def show_cursors(db, limit=1000):
+    # Cursors pointing into the middle of the upcoming and past show feeds
+    from models import Show
+    from shows import encode_show_cursor
+    now = datetime.now()
+    return [
+        encode_show_cursor('upcoming' if start_time >= now else 'past', start_time, show_id)
+        for show_id, start_time in db.session.query(Show.id, Show.start_time).order_by(Show.id).limit(limit)
+    ]
+
+
+def run_test_client(app, db, routes, choices, requests, seeded):
+    # Sequential in-process run that also counts SQL statements per request
+    statements = [0]
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', lambda *args: statements.__setitem__(0, statements[0] + 1))
+
+    client = app.test_client()
+    results = {}
+    for name, method, path, data, setup in routes:
+        latencies = []
+        statement_counts = []
+        statuses = set()
+        started = time.perf_counter()
+        for _ in range(requests):
+            ids = random_ids(choices)
+            if setup:
+                with app.app_context():
+                    ids.update(setup(ids))
+            statements[0] = 0
+            request_started = time.perf_counter()
+            response = client.open(path.format(**ids), method=method, data=data(ids) if data else None)
+            response.get_data()
+            latencies.append(time.perf_counter() - request_started)
+            statement_counts.append(statements[0])
+            statuses.add(response.status_code)
+        results[name] = summarize(latencies, time.perf_counter() - started)
+        results[name]['sql_statements'] = sum(statement_counts) / len(statement_counts)
+        results[name]['status_codes'] = sorted(statuses)
+        if name in WRITE_ROUTES:
+            with app.app_context():
+                remove_scratch_rows(db, seeded)
+    return results
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    # Time the response itself, not the page it redirects to
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+OPENER = urllib.request.build_opener(_NoRedirect)
+
+
+def http_request(base_url, method, path, data):
+    body = urllib.parse.urlencode(data).encode() if data else None
+    request = urllib.request.Request(base_url + path, data=body, method=method)
+    started = time.perf_counter()
+    try:
+        with OPENER.open(request) as response:
+            response.read()
+    except urllib.error.HTTPError as error:
+        error.read()
+    return time.perf_counter() - started
+
+
+def run_http(base_url, routes, choices, requests, concurrency):
+    # Concurrent load against a running server, without the write routes:
+    # their forms would fail the server's CSRF check, and writes would
+    # change its data
+    results = {}
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for name, method, path, data, setup in routes:
+            if name in WRITE_ROUTES:
+                continue
+            calls = []
+            for _ in range(requests):
+                ids = random_ids(choices)
+                calls.append((path.format(**ids), data(ids) if data else None))
+            started = time.perf_counter()
+            latencies = list(pool.map(lambda call: http_request(base_url, method, *call), calls))
+            results[name] = summarize(latencies, time.perf_counter() - started)
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark every route of the app.')
+    parser.add_argument('--seed', action='store_true', help='create tables and seed synthetic data first')
+    parser.add_argument('--venues', type=int, default=1000)
+    parser.add_argument('--artists', type=int, default=1000)
+    parser.add_argument('--shows', type=int, default=20000)
+    parser.add_argument('--past-ratio', type=float, default=0.5)
+    parser.add_argument('--requests', type=int, default=50, help='requests per route')
+    parser.add_argument('--url', help='base URL of a running server for the HTTP load run')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--no-cache', action='store_true', help='disable the response cache')
+    parser.add_argument('--random-seed', type=int, default=0, help='seed for the ids and forms requested')
+    parser.add_argument('--output', default='bench_output.json')
+    args = parser.parse_args()
+
+    if args.no_cache:
+        os.environ['CACHE_TYPE'] = 'none'
+
+    from app import create_app
+    from assets import _manifest_entries
+    from models import db, Artist, Show, Venue
+    from benchmarks.seed import seed
+
+    app = create_app()
+    app.config['WTF_CSRF_ENABLED'] = False
+    with app.app_context():
+        if args.seed:
+            db.drop_all(bind_key=None)
+            db.create_all(bind_key=None)
+            seed(args.venues, args.artists, args.shows, args.past_ratio)
+        seeded = {
+            name: db.session.query(db.func.max(model.id)).scalar() or 0
+            for name, model in (('venue', Venue), ('artist', Artist), ('show', Show))
+        }
+        choices = {
+            'venue_id': [venue_id for (venue_id,) in db.session.query(Venue.id)],
+            'artist_id': [artist_id for (artist_id,) in db.session.query(Artist.id)],
+            'cursor': show_cursors(db),
+            'asset': sorted(_manifest_entries(app).values()),
+        }
+    if not choices['venue_id'] or not choices['artist_id']:
+        parser.error('the database is empty; run with --seed')
+
+    # Routes whose placeholders have nothing to pick from are skipped, e.g.
+    # /assets before `flask assets build`
+    routes = []
+    for route in ROUTES:
+        missing = [name for name, values in choices.items() if not values and f'{{{name}}}' in route[2]]
+        if missing:
+            print(f'Skipping {route[0]}: no {", ".join(missing)} to request')
+        else:
+            routes.append(route)
+
+    RNG.seed(args.random_seed)
+    report = {
+        'revision': git_revision(),
+        'created_at': datetime.utcnow().isoformat(),
+        'config': vars(args),
+        'test_client': run_test_client(app, db, routes, choices, args.requests, seeded),
+    }
+    if args.url:
+        RNG.seed(args.random_seed)
+        report['http'] = run_http(args.url.rstrip('/'), routes, choices, args.requests, args.concurrency)
+
+    with open(args.output, 'w') as file:
+        json.dump(report, file, indent=2)
+    print(f'Wrote {args.output}')
+
+
+if __name__ == '__main__':
+    main()
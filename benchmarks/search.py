@@ -0,0 +1,101 @@
+# Venue search latency with and without the pg_trgm indexes, on Postgres.
+#
+#   python -m benchmarks.search --seed --rows 1000000
+#
+# "before" runs the same searches with the trigram indexes dropped inside a
+# transaction that is rolled back afterwards, so both sides see the same
+# table; "after" runs them with the indexes in place.
+import argparse
+import json
+import random
+import time
+
+from sqlalchemy import text
+
+SEARCH_COLUMNS = ('name', 'city', 'state')
+
+
+def search_terms(names, count, rng):
+    # Fragments of existing names as typed into the search box: mostly
+    # selective digit runs, some short ones matching many rows
+    terms = []
+    for name in rng.choices(names, k=count):
+        number = name.rsplit(' ', 1)[-1]
+        length = rng.choice((2, 3, 4, 4, 5, 5, 5))
+        start = rng.randint(0, max(0, len(number) - length))
+        terms.append(number[start:start + length])
+    return terms
+
+
+def time_searches(search, terms):
+    latencies = []
+    for term in terms:
+        started = time.perf_counter()
+        search(term)
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    return {
+        'searches': len(latencies),
+        'p50_ms': latencies[len(latencies) // 2] * 1000,
+        'p95_ms': latencies[int(0.95 * (len(latencies) - 1))] * 1000,
+        'mean_ms': sum(latencies) / len(latencies) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark venue search with and without trigram indexes.')
+    parser.add_argument('--seed', action='store_true', help='create tables and seed venues first')
+    parser.add_argument('--rows', type=int, default=1000000, help='venues to seed')
+    parser.add_argument('--searches', type=int, default=200, help='searches per run')
+    parser.add_argument('--output', help='also write the results to this JSON file')
+    args = parser.parse_args()
+
+    from app import create_app
+    from benchmarks.seed import seed
+    from models import db, Venue
+    from search import search_records
+
+    app = create_app()
+    with app.app_context():
+        if db.engine.dialect.name != 'postgresql':
+            parser.error('the trigram indexes only exist on Postgres; point DATABASE_URL at one')
+        if args.seed:
+            db.create_all()
+            seed(venues=args.rows, artists=0, shows=0)
+            db.session.execute(text('ANALYZE "Venue"'))
+            db.session.commit()
+
+        rows = db.session.query(db.func.count(Venue.id)).scalar()
+        names = [name for (name,) in db.session.query(Venue.name).order_by(db.func.random()).limit(10000)]
+        if not names:
+            parser.error('the database has no venues; run with --seed')
+        terms = search_terms(names, args.searches, random.Random(0))
+
+        def search(term):
+            search_records(Venue, term)
+            # Drop the loaded rows so the identity map does not grow
+            db.session.expunge_all()
+
+        # Warm the buffer cache so neither side pays for the first reads
+        for term in terms[:10]:
+            search(term)
+
+        for column in SEARCH_COLUMNS:
+            db.session.execute(text(f'DROP INDEX ix_venue_{column}_trgm'))
+        before = time_searches(search, terms)
+        db.session.rollback()
+
+        after = time_searches(search, terms)
+
+    results = {'rows': rows, 'before': before, 'after': after}
+    for label in ('before', 'after'):
+        result = results[label]
+        print(f'{label:6}  p50 {result["p50_ms"]:8.2f} ms  p95 {result["p95_ms"]:8.2f} ms  '
+              f'mean {result["mean_ms"]:8.2f} ms  ({result["searches"]} searches, {rows} rows)')
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from forms import GENRES
+from models import db, Artist, Show, Venue
+from show_stats import rebuild_show_stats
+
+CITIES = [('New York', 'NY'), ('San Francisco', 'CA'), ('Los Angeles', 'CA'), ('Chicago', 'IL'),
+          ('Austin', 'TX'), ('Seattle', 'WA'), ('Nashville', 'TN'), ('New Orleans', 'LA')]
+
+BATCH_SIZE = 5000
+
+
+def _insert(model, rows):
+    for start in range(0, len(rows), BATCH_SIZE):
+        db.session.execute(insert(model), rows[start:start + BATCH_SIZE])
+    db.session.commit()
+
+
+def seed(venues=1000, artists=1000, shows=20000, past_ratio=0.5, seed_value=0):
+    # Fill the database with synthetic venues, artists and shows. Shows are
+    # spread over the year either side of now, `past_ratio` of them past.
+    rng = random.Random(seed_value)
+    venue_ids_start = (db.session.query(db.func.max(Venue.id)).scalar() or 0) + 1
+    artist_ids_start = (db.session.query(db.func.max(Artist.id)).scalar() or 0) + 1
+
+    _insert(Venue, [{
+        'name': f'Venue {venue_ids_start + index}',
+        'genres': rng.sample(GENRES, 2),
+        'city': city,
+        'state': state,
+        'address': f'{index} Main Street',
+        'phone': '555-555-5555',
+        'website': f'https://venue{index}.example.com',
+        'facebook_link': f'https://www.facebook.com/venue{index}',
+        'seeking_talent': rng.random() < 0.5,
+        'seeking_description': 'Looking for local acts',
+        'image_link': 'https://example.com/venue.jpg',
+    } for index, (city, state) in ((index, rng.choice(CITIES)) for index in range(venues))])
+
+    _insert(Artist, [{
+        'name': f'Artist {artist_ids_start + index}',
+        'genres': rng.sample(GENRES, 2),
+        'city': city,
+        'state': state,
+        'phone': '555-555-5555',
+        'website': f'https://artist{index}.example.com',
+        'facebook_link': f'https://www.facebook.com/artist{index}',
+        'seeking_venue': rng.random() < 0.5,
+        'seeking_description': 'Looking for venues',
+        'image_link': 'https://example.com/artist.jpg',
+    } for index, (city, state) in ((index, rng.choice(CITIES)) for index in range(artists))])
+
+    now = datetime.now()
+    venue_ids = [venue_id for (venue_id,) in db.session.query(Venue.id)]
+    artist_ids = [artist_id for (artist_id,) in db.session.query(Artist.id)]
+    _insert(Show, [{
+        'venue_id': rng.choice(venue_ids),
+        'artist_id': rng.choice(artist_ids),
+        'start_time': now + timedelta(
+            days=-rng.uniform(0, 365) if rng.random() < past_ratio else rng.uniform(0, 365)
+        ),
+    } for _ in range(shows)])
+    rebuild_show_stats()
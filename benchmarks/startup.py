@@ -0,0 +1,100 @@
+# Measure the cost of importing the app and building it with create_app(),
+# which is what every worker boot and CLI command pays.
+#
+#   python -m benchmarks.startup --runs 5 --budget-ms 600
+#
+# Each run is a fresh interpreter started with -X importtime; the report
+# lists the median wall time and the imports that dominate it.
+# With --budget-ms the exit status is non-zero when the median exceeds the
+# budget, so CI can track start-up time between revisions.
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+
+from benchmarks.run import git_revision
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPT = '''
+import time
+started = time.perf_counter()
+from app import create_app
+create_app()
+print((time.perf_counter() - started) * 1000)
+'''
+
+
+def parse_importtime(stderr):
+    # Cumulative microseconds of each module imported by app.py, and of
+    # anything create_app() imports afterwards. -X importtime prints a
+    # module after its children, indented two spaces per level.
+    modules = {}
+    children = {}
+    after_app = False
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        name = name.strip()
+        if depth == 1:
+            children[name] = int(cumulative)
+        elif depth == 0:
+            if name == 'app':
+                modules.update(children)
+                after_app = True
+            elif after_app:
+                modules[name] = int(cumulative)
+            children = {}
+    return modules
+
+
+def run_once():
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', SCRIPT],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1]), parse_importtime(result.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark app start-up time.')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15, help='number of imports to report')
+    parser.add_argument('--budget-ms', type=float, help='fail when the median exceeds this')
+    parser.add_argument('--output', default='bench_startup.json')
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    median_ms = statistics.median(wall for wall, _ in runs)
+    imports = {
+        name: statistics.median(modules.get(name, 0) for _, modules in runs) / 1000
+        for name in runs[0][1]
+    }
+    slowest = sorted(imports.items(), key=lambda item: item[1], reverse=True)[:args.top]
+
+    report = {
+        'revision': git_revision(),
+        'created_at': datetime.utcnow().isoformat(),
+        'config': vars(args),
+        'median_ms': median_ms,
+        'runs_ms': [wall for wall, _ in runs],
+        'imports_ms': dict(slowest),
+    }
+    with open(args.output, 'w') as file:
+        json.dump(report, file, indent=2)
+
+    print(f'import + create_app(): {median_ms:.1f} ms (median of {args.runs})')
+    for name, cumulative_ms in slowest:
+        print(f'  {cumulative_ms:8.1f} ms  {name}')
+    if args.budget_ms is not None and median_ms > args.budget_ms:
+        print(f'Start-up exceeds the {args.budget_ms:.0f} ms budget.')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
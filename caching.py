@@ -0,0 +1,211 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import g, has_app_context, request, session
+
+
+class LRUCache:
+    # In-process LRU cache with a per-entry TTL
+
+    def __init__(self, max_entries=1024, default_ttl=300):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()
+        # Counters are kept apart so eviction never resets a tag version
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (ttl or self.default_ttl)
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_many(self, keys):
+        return [self.get(key) for key in keys]
+
+    def get_counters(self, keys):
+        with self._lock:
+            return tuple(self._counters.get(key, 0) for key in keys)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._counters.clear()
+
+
+class RedisCache:
+    # Same interface backed by a redis-py compatible client
+
+    def __init__(self, client, default_ttl=300, prefix='fyyur:'):
+        self.client = client
+        self.default_ttl = default_ttl
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        return pickle.loads(value) if value is not None else None
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self.prefix + key, pickle.dumps(value), ex=ttl or self.default_ttl)
+
+    def get_many(self, keys):
+        if not keys:
+            return []
+        values = self.client.mget([self.prefix + key for key in keys])
+        return [pickle.loads(value) if value is not None else None for value in values]
+
+    def get_counters(self, keys):
+        if not keys:
+            return ()
+        values = self.client.mget([self.prefix + key for key in keys])
+        return tuple(int(value or 0) for value in values)
+
+    def incr(self, key):
+        return self.client.incr(self.prefix + key)
+
+    def clear(self):
+        for key in self.client.scan_iter(self.prefix + '*'):
+            self.client.delete(key)
+
+
+class ResponseCache:
+    # Caches rendered pages keyed by route and arguments. Every entry
+    # records the version of the tags it depends on ('venues',
+    # 'venue:<id>', ...); invalidating a tag bumps its version so stale
+    # entries miss on their next read.
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.replica_lag = 0
+        self.hits = 0
+        self.misses = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        cache_type = app.config.get('CACHE_TYPE', 'lru')
+        default_ttl = app.config.get('CACHE_DEFAULT_TTL', 300)
+
+        if cache_type == 'redis':
+            import redis
+            client = redis.Redis.from_url(app.config['CACHE_REDIS_URL'])
+            self.backend = RedisCache(client, default_ttl=default_ttl)
+        elif cache_type == 'lru':
+            self.backend = LRUCache(app.config.get('CACHE_MAX_ENTRIES', 1024), default_ttl)
+        else:
+            self.backend = None
+        # Replicas may not have seen a write for this long (see replicas.py)
+        self.replica_lag = app.config.get('REPLICA_PIN_SECONDS', 10)
+
+    def _tag_versions(self, tags):
+        return self.backend.get_counters([f'tag:{tag}' for tag in tags])
+
+    def _request_key(self):
+        key = f'view:{request.method}:{request.full_path}'
+        # Set by @conditional: entries rendered for an older version of the
+        # page are never returned under a newer ETag
+        if g.get('page_version'):
+            key += f'#{g.page_version}'
+        if request.form:
+            key += '?' + '&'.join(f'{name}={value}' for name, value in sorted(request.form.items(multi=True)))
+        return key
+
+    def tag(self, *tags):
+        # Add tags discovered while rendering (e.g. the venues on an artist page)
+        if 'cache_tags' in g:
+            g.cache_tags.update(tags)
+
+    def invalidate(self, *tags):
+        if self.backend is None:
+            return
+        for tag in tags:
+            self.backend.incr(f'tag:{tag}')
+            if self.replica_lag:
+                self.backend.set(f'invalidated:{tag}', True, self.replica_lag)
+
+    def _replica_may_lag(self, tags):
+        # A page or value read from a replica shortly after one of its tags
+        # was invalidated may predate the write; it is served but not stored,
+        # or it would live on under the new tag version for a full ttl
+        if not (has_app_context() and g.get('db_replica') is not None):
+            return False
+        return any(self.backend.get_many([f'invalidated:{tag}' for tag in tags]))
+
+    def fetch(self, key, tags, compute, ttl=None):
+        # Cache a computed value under the same tag versioning as pages
+        if self.backend is None or (has_app_context() and g.get('read_own_writes')):
+            return compute()
+        key = f'value:{key}'
+        versions = self._tag_versions(tags)
+        entry = self.backend.get(key)
+        if entry is not None and entry[1] == versions:
+            return entry[0]
+        value = compute()
+        if not self._replica_may_lag(tags):
+            self.backend.set(key, (value, versions), ttl)
+        return value
+
+    def cached(self, *tags, ttl=None):
+        # Tags may reference view arguments, e.g. 'venue:{venue_id}'
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                # Pages carrying flashed messages are specific to one visitor,
+                # and a client that just wrote must not get a copy rendered
+                # from a lagging replica
+                if self.backend is None or '_flashes' in session or g.get('read_own_writes'):
+                    return view(*args, **kwargs)
+
+                key = self._request_key()
+                entry = self.backend.get(key)
+                if entry is not None:
+                    body, entry_tags, versions = entry
+                    if self._tag_versions(entry_tags) == versions:
+                        self.hits += 1
+                        return body
+                self.misses += 1
+
+                static_tags = [tag.format(**kwargs) for tag in tags]
+                static_versions = self._tag_versions(static_tags)
+                g.cache_tags = set()
+                rv = view(*args, **kwargs)
+                if isinstance(rv, str):
+                    dynamic_tags = sorted(g.cache_tags.difference(static_tags))
+                    entry_tags = static_tags + dynamic_tags
+                    versions = static_versions + self._tag_versions(dynamic_tags)
+                    if not self._replica_may_lag(entry_tags):
+                        self.backend.set(key, (rv, entry_tags, versions), ttl)
+                return rv
+            return wrapper
+        return decorator
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,45 @@
+import hashlib
+from functools import wraps
+
+from flask import Response, g, make_response, request, session
+
+
+def version_etag(*values):
+    key = '|'.join(str(value) for value in (request.full_path,) + values)
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def conditional(version):
+    # `version(**view_args)` runs one cheap query and returns the values the
+    # page depends on, or None when the record does not exist. A matching
+    # If-None-Match is answered with 304 before the view runs. There is no
+    # Last-Modified: deletes and shows moving into the past change the page
+    # without changing any modification time.
+    #
+    # The ETag is also handed to the response cache (g.page_version) and
+    # becomes part of its key, so a page cached before a change this process
+    # was not told about (another worker, a CLI command, replica lag) is
+    # never served under the new ETag.
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            # Pages carrying flashed messages must always be rendered
+            if '_flashes' in session:
+                return view(*args, **kwargs)
+
+            values = version(**kwargs)
+            if values is None:
+                return view(*args, **kwargs)
+
+            etag = version_etag(*values)
+            if request.if_none_match.contains(etag):
+                response = Response(status=304)
+            else:
+                g.page_version = etag
+                response = make_response(view(*args, **kwargs))
+
+            response.set_etag(etag)
+            response.cache_control.no_cache = True
+            return response
+        return wrapper
+    return decorator
@@ -1,6 +1,6 @@
 import os
 SECRET_KEY = os.urandom(32)
-from dotenv import load_dotenv
+from sqlalchemy.pool import NullPool
 
 # Grabs the folder where the script runs.
 basedir = os.path.abspath(os.path.dirname(__file__))
@@ -8,9 +8,75 @@ basedir = os.path.abspath(os.path.dirname(__file__))
 # Enable debug mode.
 DEBUG = True
 
-load_dotenv()
+# .env is loaded by app.py before anything reads the environment
+
+def _env_flag(name, default="false"):
+    return os.getenv(name, default).lower() in ("1", "true", "yes", "on")
+
+def engine_options():
+    # Behind PgBouncer (transaction pooling) the bouncer owns the pool, so
+    # connections are not held open here and prepared statements are off
+    if _env_flag("DB_PGBOUNCER"):
+        options = {"poolclass": NullPool}
+        if os.getenv("DATABASE_URL", "").startswith("postgresql+psycopg:"):
+            options["connect_args"] = {"prepare_threshold": None}
+        return options
+
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", 5)),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", 10)),
+        "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", 30)),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", 1800)),
+        "pool_pre_ping": _env_flag("DB_POOL_PRE_PING", "true"),
+    }
+
+def replica_binds():
+    # Read replicas, as comma-separated URLs, become the binds replica_0,
+    # replica_1, ... that replicas.py routes read-only requests to
+    urls = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+    return {f"replica_{index}": url for index, url in enumerate(urls)}
 
 class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL")
     SECRET_KEY = os.urandom(24)
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options()
+    SQLALCHEMY_BINDS = replica_binds()
+    # Seconds a client reads from the primary after a write (pages read from
+    # a replica are not cached for that long after a change), and between
+    # health checks of each replica
+    REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", 10))
+    REPLICA_CHECK_INTERVAL = int(os.getenv("REPLICA_CHECK_INTERVAL", 30))
+    SHOWS_PAGE_SIZE = int(os.getenv("SHOWS_PAGE_SIZE", 30))
+    # Slot length used to detect double bookings of a venue or artist
+    SHOW_DURATION_MINUTES = int(os.getenv("SHOW_DURATION_MINUTES", 120))
+    QUERY_GUARD = os.getenv("QUERY_GUARD")
+    # Seconds before the in-memory autocomplete indexes are reloaded
+    AUTOCOMPLETE_MAX_AGE = int(os.getenv("AUTOCOMPLETE_MAX_AGE", 300))
+
+    # Response cache: "lru" (in-process), "redis" or "none"
+    CACHE_TYPE = os.getenv("CACHE_TYPE", "lru")
+    CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL")
+    CACHE_DEFAULT_TTL = int(os.getenv("CACHE_DEFAULT_TTL", 300))
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", 1024))
+
+    # Application log, written off the request thread. Every worker appends
+    # to the same file, so rotate it externally (logrotate without
+    # copytruncate); the handlers reopen the file once it has been moved.
+    # LOG_INFO_SAMPLE_RATE keeps a share of INFO records.
+    LOG_FILE = os.getenv("LOG_FILE", "error.log")
+    LOG_INFO_SAMPLE_RATE = float(os.getenv("LOG_INFO_SAMPLE_RATE", 1.0))
+
+    # Statements slower than the threshold go to the slow-query log,
+    # optionally with their EXPLAIN plan
+    SLOW_QUERY_THRESHOLD_MS = int(os.getenv("SLOW_QUERY_THRESHOLD_MS", 200))
+    SLOW_QUERY_LOG = os.getenv("SLOW_QUERY_LOG", "slow_queries.log")
+    SLOW_QUERY_EXPLAIN = _env_flag("SLOW_QUERY_EXPLAIN")
+
+    # Compiled templates are kept here between restarts; empty disables it
+    JINJA_BYTECODE_CACHE_DIR = os.getenv("JINJA_BYTECODE_CACHE_DIR", os.path.join(basedir, ".jinja_cache"))
+
+    # Hashed CSS/JS bundles written by `flask assets build`; pages link the
+    # individual source files while ASSETS_BUNDLED is off or nothing is built
+    ASSETS_BUNDLED = _env_flag("ASSETS_BUNDLED", "true")
+    ASSETS_MAX_AGE = int(os.getenv("ASSETS_MAX_AGE", 365 * 24 * 3600))
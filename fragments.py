@@ -0,0 +1,12 @@
+import os
+
+from jinja2 import FileSystemBytecodeCache
+
+
+def init_template_cache(app):
+    # Compiled templates persist across worker restarts in the bytecode
+    # cache, so workers don't recompile every template on boot
+    directory = app.config.get('JINJA_BYTECODE_CACHE_DIR')
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory)
@@ -0,0 +1,198 @@
+import csv
+import json
+import os
+from itertools import islice
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import insert
+from werkzeug.datastructures import MultiDict
+
+from autocomplete import artist_index, venue_index
+from forms import ArtistForm, ShowForm, VenueForm
+from models import cache, db, Artist, Show, Venue
+from scheduling import find_conflicts, lock_rows
+from show_stats import refresh_show_stats
+
+# Form field -> model column for each importable record type
+VENUE_COLUMNS = {
+    'name': 'name', 'city': 'city', 'state': 'state', 'address': 'address',
+    'phone': 'phone', 'genres': 'genres', 'website_link': 'website',
+    'facebook_link': 'facebook_link', 'image_link': 'image_link',
+    'seeking_talent': 'seeking_talent', 'seeking_description': 'seeking_description',
+}
+
+ARTIST_COLUMNS = {
+    'name': 'name', 'city': 'city', 'state': 'state', 'phone': 'phone',
+    'genres': 'genres', 'website_link': 'website',
+    'facebook_link': 'facebook_link', 'image_link': 'image_link',
+    'seeking_venue': 'seeking_venue', 'seeking_description': 'seeking_description',
+}
+
+SHOW_COLUMNS = {'artist_id': 'artist_id', 'venue_id': 'venue_id', 'start_time': 'start_time'}
+
+# BooleanField reads any value other than 'false' and '' as true, so the
+# spellings found in CSV exports are mapped before validation
+BOOLEAN_FIELDS = {'seeking_talent', 'seeking_venue'}
+TRUE_VALUES = {'true', 't', 'yes', 'y', '1', 'on'}
+FALSE_VALUES = {'false', 'f', 'no', 'n', '0', 'off', ''}
+
+RECORD_TYPES = {
+    'venues': (Venue, VenueForm, VENUE_COLUMNS),
+    'artists': (Artist, ArtistForm, ARTIST_COLUMNS),
+    'shows': (Show, ShowForm, SHOW_COLUMNS),
+}
+
+
+def read_rows(path):
+    # Yields (line number, row dict) from a CSV or JSONL file without
+    # loading it into memory. CSV genres are separated by ';'.
+    with open(path, newline='') as file:
+        if path.endswith('.jsonl'):
+            for line_number, line in enumerate(file, start=1):
+                if line.strip():
+                    yield line_number, json.loads(line)
+        else:
+            reader = csv.DictReader(file)
+            for row in reader:
+                if row.get('genres'):
+                    row['genres'] = [genre.strip() for genre in row['genres'].split(';') if genre.strip()]
+                yield reader.line_num, row
+
+
+def form_data(row):
+    data = MultiDict()
+    for name, value in row.items():
+        # Accept the model column name for the website field as well
+        name = 'website_link' if name == 'website' else name
+        if isinstance(value, list):
+            data.setlist(name, [str(item) for item in value])
+        elif isinstance(value, bool):
+            data[name] = 'y' if value else ''
+        elif name in BOOLEAN_FIELDS and isinstance(value, str):
+            data[name] = 'y' if value.strip().lower() in TRUE_VALUES else ''
+        elif value is not None:
+            data[name] = str(value)
+    return data
+
+
+def validate_row(form_class, columns, row):
+    # Apply the same validation rules as the web forms, outside a request
+    errors = {
+        name: [f'Not a yes/no value: {value!r}.'] for name, value in row.items()
+        if name in BOOLEAN_FIELDS and isinstance(value, str)
+        and value.strip().lower() not in TRUE_VALUES | FALSE_VALUES
+    }
+    if errors:
+        return None, errors
+    form = form_class(form_data(row), meta={'csrf': False})
+    if not form.validate():
+        return None, form.errors
+    return {column: form[field].data for field, column in columns.items()}, None
+
+
+def check_show_references(records):
+    # Reject shows whose artist or venue does not exist, with one query per
+    # table. The rows are locked (venues before artists, as in book_show) so
+    # concurrent bookings cannot slip in before the batch commits.
+    errors = {}
+    for column, model in (('venue_id', Venue), ('artist_id', Artist)):
+        ids = set()
+        for index, record in enumerate(records):
+            try:
+                record[column] = int(record[column])
+                ids.add(record[column])
+            except (TypeError, ValueError):
+                errors.setdefault(index, {})[column] = ['Must be an integer id.']
+        existing = lock_rows(model, ids)
+        for index, record in enumerate(records):
+            if column not in errors.get(index, {}) and record[column] not in existing:
+                errors.setdefault(index, {})[column] = [f'{model.__name__} {record[column]} does not exist.']
+    return errors
+
+
+def check_show_conflicts(records):
+    # Overlapping bookings, against stored shows and within the batch
+    conflicts = find_conflicts([
+        (record['artist_id'], record['venue_id'], record['start_time']) for record in records
+    ])
+    return {index: {'start_time': [message]} for index, message in conflicts.items()}
+
+
+def import_batch(model, form_class, columns, batch, rejected):
+    records = []
+    sources = []
+    for line_number, row in batch:
+        record, errors = validate_row(form_class, columns, row)
+        if errors:
+            rejected.write(json.dumps({'line': line_number, 'row': row, 'errors': errors}, default=str) + '\n')
+        else:
+            records.append(record)
+            sources.append((line_number, row))
+
+    if model is Show:
+        for check in (check_show_references, check_show_conflicts):
+            if not records:
+                break
+            check_errors = check(records)
+            for index in sorted(check_errors):
+                line_number, row = sources[index]
+                rejected.write(json.dumps({'line': line_number, 'row': row, 'errors': check_errors[index]}, default=str) + '\n')
+            records = [record for index, record in enumerate(records) if index not in check_errors]
+            sources = [source for index, source in enumerate(sources) if index not in check_errors]
+
+    if not records:
+        # Release the row locks taken by the checks
+        db.session.rollback()
+        return 0
+
+    # One executemany INSERT and one transaction per batch
+    try:
+        db.session.execute(insert(model), records)
+        if model is Show:
+            refresh_show_stats(
+                venue_ids=[record['venue_id'] for record in records],
+                artist_ids=[record['artist_id'] for record in records],
+            )
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        for line_number, row in sources:
+            rejected.write(json.dumps({'line': line_number, 'row': row, 'errors': {'database': [str(e)]}}, default=str) + '\n')
+        return 0
+
+    if model is Show:
+        cache.invalidate(*{f'venue:{record["venue_id"]}' for record in records})
+        cache.invalidate(*{f'artist:{record["artist_id"]}' for record in records})
+    return len(records)
+
+
+@click.command('import')
+@click.argument('record_type', type=click.Choice(sorted(RECORD_TYPES)))
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--batch-size', default=1000, show_default=True, help='Rows per INSERT and transaction.')
+@click.option('--errors', 'errors_path', type=click.Path(dir_okay=False), help='File for rejected rows (JSONL).')
+@with_appcontext
+def import_command(record_type, path, batch_size, errors_path):
+    """Import RECORD_TYPE rows from a CSV or JSONL file at PATH."""
+    model, form_class, columns = RECORD_TYPES[record_type]
+    errors_path = errors_path or f'{os.path.splitext(path)[0]}.rejected.jsonl'
+
+    imported = 0
+    read = 0
+    rows = read_rows(path)
+    with open(errors_path, 'w') as rejected:
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            read += len(batch)
+            imported += import_batch(model, form_class, columns, batch, rejected)
+            click.echo(f'{record_type}: {read} read, {imported} imported, {read - imported} rejected')
+
+    cache.invalidate(record_type)
+    if model is Venue:
+        venue_index.invalidate()
+    elif model is Artist:
+        artist_index.invalidate()
+    click.echo(f'Done. Rejected rows written to {errors_path}')
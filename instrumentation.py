@@ -0,0 +1,162 @@
+import logging
+import threading
+import time
+
+from flask import has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+from logs import add_queued_file_handler
+
+_pool_stats = threading.local()
+
+
+class TimedQueuePool(QueuePool):
+    # QueuePool that records how long each checkout waited for a connection
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            _pool_stats.checkouts = getattr(_pool_stats, 'checkouts', 0) + 1
+            _pool_stats.wait = getattr(_pool_stats, 'wait', 0.0) + time.perf_counter() - started
+
+
+def init_pool_metrics(app, db):
+    # Log pool checkouts, checkout wait and pool usage for every request
+    logger = app.logger.getChild('pool')
+
+    @app.before_request
+    def reset_pool_stats():
+        _pool_stats.checkouts = 0
+        _pool_stats.wait = 0.0
+
+    @app.after_request
+    def log_pool_stats(response):
+        pool = db.engine.pool
+        if isinstance(pool, QueuePool):
+            stats = {
+                'checkouts': getattr(_pool_stats, 'checkouts', 0),
+                'wait_ms': round(getattr(_pool_stats, 'wait', 0.0) * 1000, 2),
+                'checked_out': pool.checkedout(),
+                'overflow': pool.overflow(),
+                'size': pool.size(),
+            }
+            logger.info(
+                'pool checkouts=%(checkouts)d wait_ms=%(wait_ms).2f checked_out=%(checked_out)d '
+                'overflow=%(overflow)d size=%(size)d',
+                stats,
+                extra={'fields': stats},
+            )
+        return response
+
+
+_sql_stats = threading.local()
+
+# Slowest statements kept per request for the structured log line
+SLOWEST_KEPT = 3
+
+
+def request_sql_stats():
+    # Statement count and DB time (seconds) of the current request
+    return getattr(_sql_stats, 'statements', 0), getattr(_sql_stats, 'db_time', 0.0)
+
+
+def _explain(cursor, dialect, statement, parameters):
+    # Plan of a slow SELECT, run on a fresh DBAPI cursor so the
+    # original cursor's results are left untouched
+    if not statement.lstrip().upper().startswith('SELECT'):
+        return None
+    prefix = 'EXPLAIN QUERY PLAN ' if dialect == 'sqlite' else 'EXPLAIN '
+    explain_cursor = cursor.connection.cursor()
+    try:
+        explain_cursor.execute(prefix + statement, parameters)
+        return '\n'.join(' '.join(str(column) for column in row) for row in explain_cursor.fetchall())
+    except Exception as e:
+        return f'EXPLAIN failed: {e}'
+    finally:
+        explain_cursor.close()
+
+
+def init_sql_metrics(app, db):
+    # Record statement count, DB time and the slowest statements of every
+    # request; log them, send them as Server-Timing and write statements
+    # above SLOW_QUERY_THRESHOLD_MS to the slow-query log
+    logger = app.logger.getChild('sql')
+    slow_logger = logging.getLogger('slow_queries')
+    slow_logger.propagate = False
+    if app.config.get('SLOW_QUERY_LOG') and not slow_logger.handlers:
+        add_queued_file_handler(app, slow_logger, app.config['SLOW_QUERY_LOG'])
+        slow_logger.setLevel(logging.INFO)
+    threshold = app.config.get('SLOW_QUERY_THRESHOLD_MS', 200) / 1000
+    explain = app.config.get('SLOW_QUERY_EXPLAIN', False)
+
+    # Every engine is timed, including read replicas
+    with app.app_context():
+        engines = list(db.engines.values())
+
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+    def stop_timer(conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info['query_started'].pop()
+        if getattr(_sql_stats, 'active', False):
+            _sql_stats.statements += 1
+            _sql_stats.db_time += duration
+            _sql_stats.slowest.append((duration, statement))
+            _sql_stats.slowest.sort(key=lambda item: item[0], reverse=True)
+            del _sql_stats.slowest[SLOWEST_KEPT:]
+
+        if duration >= threshold:
+            record = {
+                'duration_ms': round(duration * 1000, 2),
+                'route': request.endpoint if has_request_context() else None,
+                'statement': statement,
+                'parameters': repr(parameters),
+            }
+            if explain and not executemany:
+                record['plan'] = _explain(cursor, conn.dialect.name, statement, parameters)
+            slow_logger.info('slow query', extra={'fields': record})
+
+    for engine in engines:
+        event.listen(engine, 'before_cursor_execute', start_timer)
+        event.listen(engine, 'after_cursor_execute', stop_timer)
+
+    @app.before_request
+    def reset_sql_stats():
+        _sql_stats.active = True
+        _sql_stats.started = time.perf_counter()
+        _sql_stats.statements = 0
+        _sql_stats.db_time = 0.0
+        _sql_stats.slowest = []
+
+    @app.after_request
+    def report_sql_stats(response):
+        if not getattr(_sql_stats, 'active', False):
+            return response
+        _sql_stats.active = False
+        total_time = time.perf_counter() - _sql_stats.started
+
+        logger.info(
+            '%s %s: %d statements, %.2f ms in DB',
+            request.method, request.path, _sql_stats.statements, _sql_stats.db_time * 1000,
+            extra={'fields': {
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'statements': _sql_stats.statements,
+                'db_ms': round(_sql_stats.db_time * 1000, 2),
+                'total_ms': round(total_time * 1000, 2),
+                'slowest': [
+                    {'ms': round(duration * 1000, 2), 'statement': statement}
+                    for duration, statement in _sql_stats.slowest
+                ],
+            }},
+        )
+        response.headers.add(
+            'Server-Timing',
+            f'db;dur={_sql_stats.db_time * 1000:.2f};desc="{_sql_stats.statements} queries", '
+            f'app;dur={total_time * 1000:.2f}'
+        )
+        return response
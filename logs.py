@@ -0,0 +1,125 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import uuid
+from logging.handlers import QueueHandler, QueueListener, WatchedFileHandler
+
+from flask import g, has_request_context, request
+from flask.logging import default_handler
+
+
+class RequestContextFilter(logging.Filter):
+    # Runs on the request thread, before the record is queued
+    def filter(self, record):
+        if has_request_context():
+            record.request_id = g.get('request_id')
+            record.route = request.endpoint
+        else:
+            record.request_id = None
+            record.route = None
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    # Keep a fraction of INFO (and lower) records; warnings and errors always pass
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno > logging.INFO or random.random() < self.rate
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        data = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', None),
+            'route': getattr(record, 'route', None),
+            'location': f'{record.pathname}:{record.lineno}',
+        }
+        data.update(getattr(record, 'fields', {}))
+        if record.exc_info:
+            data['exception'] = self.formatException(record.exc_info)
+        return json.dumps(data)
+
+
+def _file_handler(path):
+    # Several worker processes append to the same file, so none of them may
+    # rotate it: logrotate (or similar) moves the file away and every
+    # process reopens the path on its next write
+    handler = WatchedFileHandler(path)
+    handler.setFormatter(JsonFormatter())
+    return handler
+
+
+class _InProcessQueueHandler(QueueHandler):
+    # Resolve the message on the calling thread but keep exc_info on the
+    # record so the JSON formatter can render it
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+# Threads do not survive fork, so workers forked from a preloading master
+# restart the listener of every queued handler; the hook is registered once
+_listener_starters = []
+
+
+def _restart_listeners():
+    for start_listener in _listener_starters:
+        start_listener()
+
+
+os.register_at_fork(after_in_child=_restart_listeners)
+
+
+def add_queued_file_handler(app, logger, path, sample_rate=1.0):
+    # Attach a JSON log file to `logger` through a queue; the disk write
+    # happens on the listener thread, off the request path
+    log_queue = queue.SimpleQueue()
+    queue_handler = _InProcessQueueHandler(log_queue)
+    queue_handler.addFilter(RequestContextFilter())
+    if sample_rate < 1.0:
+        queue_handler.addFilter(SamplingFilter(sample_rate))
+
+    file_handler = _file_handler(path)
+
+    def start_listener():
+        listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)
+        return listener
+
+    _listener_starters.append(start_listener)
+    logger.addHandler(queue_handler)
+    return start_listener()
+
+
+def init_logging(app):
+    @app.before_request
+    def assign_request_id():
+        g.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex
+
+    @app.after_request
+    def send_request_id(response):
+        if 'request_id' in g:
+            response.headers['X-Request-ID'] = g.request_id
+        return response
+
+    # The queued file handler replaces Flask's synchronous stderr handler
+    app.logger.removeHandler(default_handler)
+    app.logger.setLevel(logging.INFO)
+    add_queued_file_handler(
+        app,
+        app.logger,
+        app.config.get('LOG_FILE', 'error.log'),
+        app.config.get('LOG_INFO_SAMPLE_RATE', 1.0),
+    )
@@ -0,0 +1,86 @@
+import os
+import resource
+import time
+
+from flask import Response, before_render_template, g, request, template_rendered
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess,
+)
+from sqlalchemy.pool import QueuePool
+
+from instrumentation import request_sql_stats
+
+# Under gunicorn set PROMETHEUS_MULTIPROC_DIR to a shared, empty directory
+# before the workers start: every worker then writes its samples to
+# memory-mapped files there and /metrics aggregates them across workers.
+# The gunicorn child_exit hook should call
+# prometheus_client.multiprocess.mark_process_dead(worker.pid).
+MULTIPROCESS = bool(os.environ.get('PROMETHEUS_MULTIPROC_DIR'))
+
+REQUESTS = Counter('fyyur_requests_total', 'HTTP requests', ['route', 'method', 'status'])
+REQUEST_LATENCY = Histogram('fyyur_request_duration_seconds', 'Request latency', ['route'])
+REQUEST_DB_TIME = Histogram('fyyur_request_db_seconds', 'Time spent in SQL per request', ['route'])
+REQUEST_STATEMENTS = Histogram(
+    'fyyur_request_sql_statements', 'SQL statements per request', ['route'],
+    buckets=(1, 2, 3, 5, 10, 20, 50, 100, float('inf'))
+)
+TEMPLATE_RENDER_TIME = Histogram('fyyur_template_render_seconds', 'Template render time', ['template'])
+POOL_CHECKED_OUT = Gauge('fyyur_db_pool_checked_out', 'Connections checked out', multiprocess_mode='livesum')
+POOL_SIZE = Gauge('fyyur_db_pool_size', 'Configured pool size', multiprocess_mode='livesum')
+POOL_OVERFLOW = Gauge('fyyur_db_pool_overflow', 'Connections in overflow', multiprocess_mode='livesum')
+CACHE_HITS = Gauge('fyyur_cache_hits', 'Response cache hits since start', multiprocess_mode='livesum')
+CACHE_MISSES = Gauge('fyyur_cache_misses', 'Response cache misses since start', multiprocess_mode='livesum')
+MAX_RSS = Gauge('fyyur_process_max_rss_bytes', 'Peak resident memory of the live workers', multiprocess_mode='livesum')
+
+
+def _route():
+    return request.endpoint or 'unmatched'
+
+
+def _template_started(sender, template, context, **extra):
+    g.setdefault('template_started', []).append(time.perf_counter())
+
+
+def _template_finished(sender, template, context, **extra):
+    started = g.get('template_started')
+    if started:
+        TEMPLATE_RENDER_TIME.labels(template.name or 'string').observe(time.perf_counter() - started.pop())
+
+
+def init_metrics(app, db, cache):
+    before_render_template.connect(_template_started, app)
+    template_rendered.connect(_template_finished, app)
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def record_request_metrics(response):
+        route = _route()
+        REQUESTS.labels(route, request.method, response.status_code).inc()
+        if 'request_started' in g:
+            REQUEST_LATENCY.labels(route).observe(time.perf_counter() - g.request_started)
+        statements, db_time = request_sql_stats()
+        REQUEST_DB_TIME.labels(route).observe(db_time)
+        REQUEST_STATEMENTS.labels(route).observe(statements)
+
+        pool = db.engine.pool
+        if isinstance(pool, QueuePool):
+            POOL_CHECKED_OUT.set(pool.checkedout())
+            POOL_SIZE.set(pool.size())
+            POOL_OVERFLOW.set(max(pool.overflow(), 0))
+        CACHE_HITS.set(cache.hits)
+        CACHE_MISSES.set(cache.misses)
+        # ru_maxrss is reported in kilobytes on Linux
+        MAX_RSS.set(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024)
+        return response
+
+    @app.route('/metrics')
+    def metrics():
+        if MULTIPROCESS:
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = REGISTRY
+        return Response(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,32 @@
+"""updated_at on Venue, Artist and Show
+
+Revision ID: 1e9b6d3f7c28
+Revises: c41e8b7d2a06
+Create Date: 2026-10-18 17:24:51.330871
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1e9b6d3f7c28'
+down_revision = 'c41e8b7d2a06'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing rows start out as modified now. Batch mode lets SQLite add a
+    # column with a non-constant default; Postgres gets a plain ALTER TABLE.
+    for table in ('Venue', 'Artist', 'Show'):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=False))
+    op.create_index('ix_Show_updated_at', 'Show', ['updated_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_Show_updated_at', table_name='Show')
+    for table in ('Show', 'Artist', 'Venue'):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('updated_at')
@@ -0,0 +1,86 @@
+"""Initial schema
+
+Revision ID: 3f1c2a9d4e57
+Revises:
+Create Date: 2026-10-18 17:05:12.418305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a9d4e57'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# Postgres arrays; JSON lists on SQLite, as in models.GENRE_LIST
+GENRE_LIST = postgresql.ARRAY(sa.String()).with_variant(sa.JSON(), 'sqlite')
+
+
+def upgrade():
+    # Databases set up with db.create_all() before migrations existed
+    # already have these tables; they are adopted as they are
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'Venue' not in existing:
+        _create_venue()
+    if 'Artist' not in existing:
+        _create_artist()
+    if 'Show' not in existing:
+        _create_show()
+
+
+def _create_venue():
+    op.create_table('Venue',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('genres', GENRE_LIST, nullable=False),
+        sa.Column('city', sa.String(length=120), nullable=False),
+        sa.Column('state', sa.String(length=120), nullable=False),
+        sa.Column('address', sa.String(length=120), nullable=False),
+        sa.Column('phone', sa.String(length=120), nullable=False),
+        sa.Column('website', sa.String(length=500), nullable=False),
+        sa.Column('seeking_talent', sa.Boolean(), nullable=False),
+        sa.Column('seeking_description', sa.String(length=120), nullable=True),
+        sa.Column('image_link', sa.String(length=500), nullable=True),
+        sa.Column('facebook_link', sa.String(length=120), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def _create_artist():
+    op.create_table('Artist',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('name', sa.String(), nullable=True),
+        sa.Column('city', sa.String(length=120), nullable=True),
+        sa.Column('state', sa.String(length=120), nullable=True),
+        sa.Column('phone', sa.String(length=120), nullable=True),
+        sa.Column('genres', GENRE_LIST, nullable=True),
+        sa.Column('website', sa.String(length=500), nullable=True),
+        sa.Column('seeking_venue', sa.Boolean(), nullable=True),
+        sa.Column('seeking_description', sa.String(length=120), nullable=True),
+        sa.Column('image_link', sa.String(length=500), nullable=True),
+        sa.Column('facebook_link', sa.String(length=120), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def _create_show():
+    op.create_table('Show',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('artist_id', sa.Integer(), nullable=False),
+        sa.Column('venue_id', sa.Integer(), nullable=False),
+        sa.Column('start_time', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['artist_id'], ['Artist.id'], ),
+        sa.ForeignKeyConstraint(['venue_id'], ['Venue.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('Show')
+    op.drop_table('Artist')
+    op.drop_table('Venue')
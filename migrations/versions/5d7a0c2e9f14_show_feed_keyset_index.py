@@ -0,0 +1,24 @@
+"""Keyset index for the /shows feed
+
+Revision ID: 5d7a0c2e9f14
+Revises: 8b2e4f6a1c93
+Create Date: 2026-10-18 17:14:03.552970
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d7a0c2e9f14'
+down_revision = '8b2e4f6a1c93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_show_start_time_id', 'Show', ['start_time', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_show_start_time_id', table_name='Show')
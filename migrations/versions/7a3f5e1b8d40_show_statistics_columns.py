@@ -0,0 +1,49 @@
+"""Denormalized show statistics on Venue and Artist
+
+Revision ID: 7a3f5e1b8d40
+Revises: 1e9b6d3f7c28
+Create Date: 2026-10-18 17:31:16.775402
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a3f5e1b8d40'
+down_revision = '1e9b6d3f7c28'
+branch_labels = None
+depends_on = None
+
+# Table -> its foreign key column on Show
+TARGETS = (('Venue', 'venue_id'), ('Artist', 'artist_id'))
+
+
+def upgrade():
+    for table, _ in TARGETS:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column('upcoming_shows_count', sa.Integer(), server_default='0', nullable=False))
+            batch_op.add_column(sa.Column('past_shows_count', sa.Integer(), server_default='0', nullable=False))
+            batch_op.add_column(sa.Column('next_show_at', sa.DateTime(), nullable=True))
+        op.create_index(f'ix_{table}_next_show_at', table, ['next_show_at'], unique=False)
+
+    # Fill in the statistics of existing rows, as `flask stats rebuild` does;
+    # start times are naive local times, so "now" comes from here
+    for table, column in TARGETS:
+        op.get_bind().execute(sa.text(f'''
+            UPDATE "{table}" SET
+                upcoming_shows_count = (SELECT count(*) FROM "Show" WHERE "Show".{column} = "{table}".id AND "Show".start_time > :now),
+                past_shows_count = (SELECT count(*) FROM "Show" WHERE "Show".{column} = "{table}".id AND "Show".start_time <= :now),
+                next_show_at = (SELECT min("Show".start_time) FROM "Show" WHERE "Show".{column} = "{table}".id AND "Show".start_time > :now)
+        '''), {'now': datetime.now()})
+
+
+def downgrade():
+    for table, _ in TARGETS:
+        op.drop_index(f'ix_{table}_next_show_at', table_name=table)
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('next_show_at')
+            batch_op.drop_column('past_shows_count')
+            batch_op.drop_column('upcoming_shows_count')
@@ -0,0 +1,37 @@
+"""Trigram indexes for venue and artist search
+
+Revision ID: 8b2e4f6a1c93
+Revises: 3f1c2a9d4e57
+Create Date: 2026-10-18 17:09:40.126533
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b2e4f6a1c93'
+down_revision = '3f1c2a9d4e57'
+branch_labels = None
+depends_on = None
+
+SEARCH_COLUMNS = (('Venue', 'name'), ('Venue', 'city'), ('Venue', 'state'),
+                  ('Artist', 'name'), ('Artist', 'city'), ('Artist', 'state'))
+
+
+def upgrade():
+    # gin_trgm_ops comes with pg_trgm, which has to exist before the indexes
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    for table, column in SEARCH_COLUMNS:
+        op.create_index(
+            f'ix_{table.lower()}_{column}_trgm', table, [column], unique=False,
+            postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'}
+        )
+
+
+def downgrade():
+    # The extension stays; other database objects may depend on it
+    for table, column in SEARCH_COLUMNS:
+        op.drop_index(f'ix_{table.lower()}_{column}_trgm', table_name=table)
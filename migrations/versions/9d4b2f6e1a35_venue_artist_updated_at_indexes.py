@@ -0,0 +1,27 @@
+"""Indexes on Venue.updated_at and Artist.updated_at
+
+Revision ID: 9d4b2f6e1a35
+Revises: e2c8a4f09b17
+Create Date: 2026-10-18 19:12:40.518306
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d4b2f6e1a35'
+down_revision = 'e2c8a4f09b17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # max(updated_at) in the page versions reads one index entry
+    op.create_index('ix_Venue_updated_at', 'Venue', ['updated_at'], unique=False)
+    op.create_index('ix_Artist_updated_at', 'Artist', ['updated_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_Artist_updated_at', table_name='Artist')
+    op.drop_index('ix_Venue_updated_at', table_name='Venue')
@@ -0,0 +1,29 @@
+"""Indexes for per-venue and per-artist show lookups and the area listing
+
+Revision ID: c41e8b7d2a06
+Revises: 5d7a0c2e9f14
+Create Date: 2026-10-18 17:18:27.904113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41e8b7d2a06'
+down_revision = '5d7a0c2e9f14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Foreign keys are not indexed by Postgres on their own
+    op.create_index('ix_show_venue_id_start_time', 'Show', ['venue_id', 'start_time'], unique=False)
+    op.create_index('ix_show_artist_id_start_time', 'Show', ['artist_id', 'start_time'], unique=False)
+    op.create_index('ix_venue_city_state', 'Venue', ['city', 'state'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_venue_city_state', table_name='Venue')
+    op.drop_index('ix_show_artist_id_start_time', table_name='Show')
+    op.drop_index('ix_show_venue_id_start_time', table_name='Show')
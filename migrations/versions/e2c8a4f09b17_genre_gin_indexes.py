@@ -0,0 +1,27 @@
+"""GIN indexes for genre filters
+
+Revision ID: e2c8a4f09b17
+Revises: 7a3f5e1b8d40
+Create Date: 2026-10-18 17:36:02.189644
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2c8a4f09b17'
+down_revision = '7a3f5e1b8d40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Serve genres @> ARRAY[...] and genres && ARRAY[...]
+    op.create_index('ix_venue_genres', 'Venue', ['genres'], unique=False, postgresql_using='gin')
+    op.create_index('ix_artist_genres', 'Artist', ['genres'], unique=False, postgresql_using='gin')
+
+
+def downgrade():
+    op.drop_index('ix_artist_genres', table_name='Artist')
+    op.drop_index('ix_venue_genres', table_name='Venue')
@@ -1,43 +1,87 @@
-from flask import Flask
-from flask_migrate import Migrate
+from datetime import datetime
+
 from flask_moment import Moment
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import ARRAY
+from sqlalchemy import DDL, event
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from caching import ResponseCache
+from instrumentation import TimedQueuePool
+from replicas import RoutingSession
+
+# Extensions, bound to an app by create_app()
+moment = Moment()
+db = SQLAlchemy(engine_options={'poolclass': TimedQueuePool}, session_options={'class_': RoutingSession})
+cache = ResponseCache()
+
+# Trigram indexes used by search need the pg_trgm extension
+event.listen(
+    db.metadata,
+    'before_create',
+    DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(dialect='postgresql')
+)
 
-from config import Config
+# Genre lists are Postgres arrays; SQLite (local development and tests)
+# stores them as JSON
+GENRE_LIST = ARRAY(db.String).with_variant(db.JSON(), 'sqlite')
 
-# App & DB Config
-app = Flask(__name__)
-app.config.from_object(Config)
-moment = Moment(app)
-db = SQLAlchemy(app)
-migrate = Migrate(app, db)
+def trigram_index(table, column):
+    return db.Index(
+        f'ix_{table.lower()}_{column}_trgm', column,
+        postgresql_using='gin',
+        postgresql_ops={column: 'gin_trgm_ops'}
+    )
 
 # Show Model
 class Show(db.Model):
 
     __tablename__ = 'Show'
+    __table_args__ = (
+        # Per-venue and per-artist show lookups filtered by start_time
+        db.Index('ix_show_venue_id_start_time', 'venue_id', 'start_time'),
+        db.Index('ix_show_artist_id_start_time', 'artist_id', 'start_time'),
+        # Keyset pagination of the /shows feed
+        db.Index('ix_show_start_time_id', 'start_time', 'id'),
+    )
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     artist_id = db.Column(db.Integer, db.ForeignKey('Artist.id'), nullable=False)
     venue_id = db.Column(db.Integer, db.ForeignKey('Venue.id'), nullable=False)
     start_time = db.Column(db.DateTime,  nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False, index=True, default=datetime.utcnow, onupdate=datetime.utcnow, server_default=db.func.now())
 
     # Relationships
     artist = db.relationship('Artist', back_populates='shows')
     venue = db.relationship('Venue', back_populates='shows')
 
     def __repr__(self):
-        artist_name = Artist.query.get(self.artist_id).name
-        venue_name = Venue.query.get(self.venue_id).name
-        return f'<"Show:id({self.id}){artist_name}@{venue_name}, start_time={self.start_time}">'
+        return f'<"Show:id({self.id})artist({self.artist_id})@venue({self.venue_id}), start_time={self.start_time}">'
+
+    # Where "now" falls, for every page, count and check: a show starting
+    # exactly now is still upcoming, and past once its start is behind now
+    @classmethod
+    def upcoming(cls, now):
+        return cls.start_time >= now
+
+    @classmethod
+    def past(cls, now):
+        return cls.start_time < now
 
 # Venue Model
 class Venue(db.Model):
     __tablename__ = 'Venue'
+    __table_args__ = (
+        trigram_index('Venue', 'name'),
+        trigram_index('Venue', 'city'),
+        trigram_index('Venue', 'state'),
+        # Grouping of the /venues area listing
+        db.Index('ix_venue_city_state', 'city', 'state'),
+        # Genre containment/overlap filters
+        db.Index('ix_venue_genres', 'genres', postgresql_using='gin'),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     name = db.Column(db.String, nullable=False)
-    genres = db.Column(ARRAY(db.String), nullable=False)
+    genres = db.Column(GENRE_LIST, nullable=False)
     city = db.Column(db.String(120), nullable=False)
     state = db.Column(db.String(120), nullable=False)
     address = db.Column(db.String(120), nullable=False)
@@ -47,6 +91,12 @@ class Venue(db.Model):
     seeking_description = db.Column(db.String(120), nullable=True)
     image_link = db.Column(db.String(500))
     facebook_link = db.Column(db.String(120))
+    updated_at = db.Column(db.DateTime, nullable=False, index=True, default=datetime.utcnow, onupdate=datetime.utcnow, server_default=db.func.now())
+
+    # Denormalized show statistics, maintained by show_stats.py
+    upcoming_shows_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    past_shows_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    next_show_at = db.Column(db.DateTime, nullable=True, index=True)
 
     # Relationships
     shows = db.relationship('Show', back_populates='venue', lazy=True)
@@ -57,18 +107,31 @@ class Venue(db.Model):
 # Artist Model
 class Artist(db.Model):
     __tablename__ = 'Artist'
+    __table_args__ = (
+        trigram_index('Artist', 'name'),
+        trigram_index('Artist', 'city'),
+        trigram_index('Artist', 'state'),
+        # Genre containment/overlap filters
+        db.Index('ix_artist_genres', 'genres', postgresql_using='gin'),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     name = db.Column(db.String)
     city = db.Column(db.String(120))
     state = db.Column(db.String(120))
     phone = db.Column(db.String(120))
-    genres = db.Column(ARRAY(db.String), nullable=True)
+    genres = db.Column(GENRE_LIST, nullable=True)
     website = db.Column(db.String(500), nullable=True)
     seeking_venue = db.Column(db.Boolean, nullable=True, default=False)
     seeking_description = db.Column(db.String(120), nullable=True)
     image_link = db.Column(db.String(500))
     facebook_link = db.Column(db.String(120))
+    updated_at = db.Column(db.DateTime, nullable=False, index=True, default=datetime.utcnow, onupdate=datetime.utcnow, server_default=db.func.now())
+
+    # Denormalized show statistics, maintained by show_stats.py
+    upcoming_shows_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    past_shows_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    next_show_at = db.Column(db.DateTime, nullable=True, index=True)
 
     # Relationships
     shows = db.relationship('Show', back_populates='artist', lazy=True)
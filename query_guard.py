@@ -0,0 +1,68 @@
+import logging
+import threading
+from contextlib import contextmanager
+
+from flask import before_render_template, template_rendered
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+_state = threading.local()
+_mode = None
+
+
+class LazyLoadError(RuntimeError):
+    pass
+
+
+@contextmanager
+def no_lazy_loads(where):
+    # Flag any ORM query issued while the block runs: relationship lazy
+    # loads, refreshes of expired attributes, Query.get() in a __repr__...
+    previous = getattr(_state, 'where', None)
+    _state.where = where
+    try:
+        yield
+    finally:
+        _state.where = previous
+
+
+def _check_lazy_load(orm_execute_state):
+    where = getattr(_state, 'where', None)
+    if where is None:
+        return
+
+    message = f'Unexpected query during {where}: {orm_execute_state.statement}'
+    if _mode == 'raise':
+        raise LazyLoadError(message)
+    logging.getLogger(__name__).warning(message)
+
+
+class LazyLoadLogFilter(logging.Filter):
+    # Format records eagerly so reprs run under the guard
+    def filter(self, record):
+        with no_lazy_loads('logging'):
+            record.msg = record.getMessage()
+            record.args = None
+        return True
+
+
+def _template_started(sender, template, context, **extra):
+    _state.where = f'rendering {template.name or "template"}'
+
+
+def _template_finished(sender, template, context, **extra):
+    _state.where = None
+
+
+def init_query_guard(app):
+    # Enabled with QUERY_GUARD=raise|log, and raises by default in debug mode
+    global _mode
+    _mode = app.config.get('QUERY_GUARD') or ('raise' if app.debug else None)
+    if not _mode:
+        return
+
+    event.listen(Session, 'do_orm_execute', _check_lazy_load)
+    before_render_template.connect(_template_started, app)
+    template_rendered.connect(_template_finished, app)
+    app.teardown_request(lambda exc: _template_finished(app, None, None))
+    app.logger.addFilter(LazyLoadLogFilter())
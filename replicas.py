@@ -0,0 +1,118 @@
+import itertools
+import logging
+import time
+from functools import wraps
+
+from flask import current_app, g, has_app_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.sql.dml import UpdateBase
+
+# Set after a write; while present the client reads from the primary
+PIN_COOKIE = 'db_primary'
+
+logger = logging.getLogger(__name__)
+
+
+class ReplicaSet:
+    # Round-robin over the replica engines. Each replica is probed with
+    # SELECT 1 at most once per check interval; one that fails the probe
+    # (or drops a connection) is skipped until the next probe succeeds.
+
+    def __init__(self, engines, check_interval=30):
+        self.engines = engines
+        self.check_interval = check_interval
+        self._status = {}
+        self._counter = itertools.count()
+
+    def _probe(self, name, engine):
+        try:
+            with engine.connect() as connection:
+                connection.execute(text('SELECT 1'))
+            return True
+        except SQLAlchemyError as e:
+            logger.warning('Replica %s failed its health check: %s', name, e)
+            return False
+
+    def is_healthy(self, name, engine):
+        healthy, checked_at = self._status.get(name, (None, None))
+        now = time.monotonic()
+        if checked_at is None or now - checked_at >= self.check_interval:
+            healthy = self._probe(name, engine)
+            self._status[name] = (healthy, now)
+        return healthy
+
+    def mark_down(self, name):
+        self._status[name] = (False, time.monotonic())
+
+    def pick(self):
+        # Next healthy replica, or None to fall back to the primary
+        for _ in range(len(self.engines)):
+            name, engine = self.engines[next(self._counter) % len(self.engines)]
+            if self.is_healthy(name, engine):
+                return engine
+        return None
+
+
+class RoutingSession(Session):
+    # Reads made by a @replica_reads view go to one replica for the whole
+    # request. Flushes and INSERT/UPDATE/DELETE always go to the primary
+    # and send the rest of the request there too, so a view reads its own
+    # writes; they also pin the client to the primary for a while.
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_app_context():
+            if self._flushing or isinstance(clause, UpdateBase):
+                g.db_wrote = True
+                g.db_replica = None
+            elif g.get('db_replica') is not None:
+                return g.db_replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def replica_reads(view):
+    # Serve the view's queries from a read replica unless the client wrote
+    # recently
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        replicas = current_app.extensions.get('replicas')
+        if replicas is not None:
+            if PIN_COOKIE in request.cookies:
+                g.read_own_writes = True
+            else:
+                g.db_replica = replicas.pick()
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def _mark_down_on_disconnect(replicas, name):
+    def handle_error(context):
+        if context.is_disconnect:
+            replicas.mark_down(name)
+    return handle_error
+
+
+def init_replicas(app, db):
+    # Replicas are the binds named replica_<n> (see config.replica_binds)
+    with app.app_context():
+        engines = sorted(
+            (key, engine) for key, engine in db.engines.items()
+            if key is not None and key.startswith('replica_')
+        )
+    if not engines:
+        return
+
+    replicas = ReplicaSet(engines, app.config.get('REPLICA_CHECK_INTERVAL', 30))
+    app.extensions['replicas'] = replicas
+
+    for name, engine in engines:
+        event.listen(engine, 'handle_error', _mark_down_on_disconnect(replicas, name))
+
+    pin_seconds = app.config.get('REPLICA_PIN_SECONDS', 10)
+
+    @app.after_request
+    def pin_to_primary(response):
+        if g.get('db_wrote'):
+            response.set_cookie(PIN_COOKIE, '1', max_age=pin_seconds, httponly=True, samesite='Lax')
+        return response
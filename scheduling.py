@@ -0,0 +1,100 @@
+from bisect import bisect_left
+from datetime import timedelta
+
+from flask import current_app
+from sqlalchemy import or_, select
+
+from models import db, Artist, Show, Venue
+from show_stats import record_new_show
+
+
+class BookingError(ValueError):
+    pass
+
+
+def lock_rows(model, ids):
+    # Row locks held until the transaction ends, taken in id order; concurrent
+    # bookings for the same venue or artist queue here instead of locking the
+    # Show table. Returns the ids that exist.
+    if not ids:
+        return set()
+    return set(db.session.scalars(
+        select(model.id).where(model.id.in_(ids)).order_by(model.id).with_for_update()
+    ))
+
+
+def _overlapping(start_times, start_time, duration):
+    # start_times is sorted; look for one within `duration` of start_time
+    index = bisect_left(start_times, start_time - duration + timedelta(microseconds=1))
+    if index < len(start_times) and start_times[index] < start_time + duration:
+        return start_times[index]
+    return None
+
+
+def find_conflicts(bookings):
+    # Overlap check for (artist_id, venue_id, start_time) bookings, both
+    # against the shows already stored and between the bookings themselves;
+    # the stored shows are read in one query served by the (venue_id,
+    # start_time) and (artist_id, start_time) indexes. Returns a message for
+    # the index of every booking that cannot be made.
+    if not bookings:
+        return {}
+    duration = timedelta(minutes=current_app.config['SHOW_DURATION_MINUTES'])
+    start_times = [start_time for _, _, start_time in bookings]
+    stored = db.session.query(Show.venue_id, Show.artist_id, Show.start_time).filter(
+        or_(
+            Show.venue_id.in_({venue_id for _, venue_id, _ in bookings}),
+            Show.artist_id.in_({artist_id for artist_id, _, _ in bookings})
+        ),
+        Show.start_time > min(start_times) - duration,
+        Show.start_time < max(start_times) + duration
+    ).all()
+
+    by_venue = {}
+    by_artist = {}
+    for venue_id, artist_id, start_time in stored:
+        by_venue.setdefault(venue_id, []).append(start_time)
+        by_artist.setdefault(artist_id, []).append(start_time)
+    for times in (*by_venue.values(), *by_artist.values()):
+        times.sort()
+
+    conflicts = {}
+    for index, (artist_id, venue_id, start_time) in enumerate(bookings):
+        venue_times = by_venue.setdefault(venue_id, [])
+        artist_times = by_artist.setdefault(artist_id, [])
+        clash = _overlapping(venue_times, start_time, duration)
+        if clash is not None:
+            conflicts[index] = f'Venue {venue_id} already has a show at {clash:%Y-%m-%d %H:%M}.'
+            continue
+        clash = _overlapping(artist_times, start_time, duration)
+        if clash is not None:
+            conflicts[index] = f'Artist {artist_id} already has a show at {clash:%Y-%m-%d %H:%M}.'
+            continue
+        # Later bookings in the same batch must not overlap this one
+        venue_times.insert(bisect_left(venue_times, start_time), start_time)
+        artist_times.insert(bisect_left(artist_times, start_time), start_time)
+    return conflicts
+
+
+def book_show(artist_id, venue_id, start_time):
+    # Validate and insert a show in the current transaction; the caller commits
+    try:
+        artist_id = int(artist_id)
+        venue_id = int(venue_id)
+    except (TypeError, ValueError):
+        raise BookingError('Artist and venue ids must be numbers.')
+
+    # Always lock the venue before the artist so bookings cannot deadlock
+    if not lock_rows(Venue, [venue_id]):
+        raise BookingError(f'Venue {venue_id} does not exist.')
+    if not lock_rows(Artist, [artist_id]):
+        raise BookingError(f'Artist {artist_id} does not exist.')
+
+    conflict = find_conflicts([(artist_id, venue_id, start_time)]).get(0)
+    if conflict is not None:
+        raise BookingError(conflict)
+
+    show = Show(artist_id=artist_id, venue_id=venue_id, start_time=start_time)
+    db.session.add(show)
+    record_new_show(venue_id, artist_id, start_time)
+    return show
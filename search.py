@@ -0,0 +1,106 @@
+import json
+from collections import Counter
+
+from flask import abort, g, request
+from sqlalchemy import and_, func, or_, type_coerce
+
+from forms import GENRES
+from models import cache, db
+
+
+# Escape LIKE wildcards so the search term is matched literally
+def _like_pattern(term):
+    escaped = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{escaped}%'
+
+
+def requested_genres():
+    # Genre filters from the query string or the search form
+    genres = request.values.getlist('genre')
+    match = request.values.get('match', 'all')
+    if match not in ('all', 'any') or not set(genres).issubset(GENRES):
+        abort(400)
+    return genres, match
+
+
+def _is_postgres():
+    return db.engine.dialect.name == 'postgresql'
+
+
+def _genre_condition(model, genre):
+    # SQLite keeps the genres as a JSON list: match the quoted element
+    pattern = _like_pattern(json.dumps(genre))
+    return type_coerce(model.genres, db.String).like(pattern, escape='\\')
+
+
+def filter_genres(query, model, genres, match='all'):
+    # genres @> ARRAY[...] when every genre is required, && when any will do;
+    # both are served by the GIN index on the genres column
+    if not genres:
+        return query
+    if not _is_postgres():
+        conditions = [_genre_condition(model, genre) for genre in genres]
+        return query.filter(or_(*conditions) if match == 'any' else and_(*conditions))
+    if match == 'any':
+        return query.filter(model.genres.overlap(genres))
+    return query.filter(model.genres.contains(genres))
+
+
+def _search_condition(model, term):
+    pattern = _like_pattern(term)
+    return or_(
+        model.name.ilike(pattern, escape='\\'),
+        model.city.ilike(pattern, escape='\\'),
+        model.state.ilike(pattern, escape='\\'),
+    )
+
+
+def genre_facets(model, genres=(), match='all', term=None):
+    # Number of records per genre among those matching the current genre
+    # filter (and search term, on the search pages), counted in a single
+    # unnest/GROUP BY query. On the listing pages the counts are cached under
+    # the page version set by @conditional, which moves with any change to
+    # the records, made by this process or not. Search terms are arbitrary
+    # input, so those counts are never cached.
+    tag = model.__tablename__.lower() + 's'
+    version = g.get('page_version')
+
+    def compute():
+        if _is_postgres():
+            query = db.session.query(func.unnest(model.genres).label('genre'))
+        else:
+            query = db.session.query(model.genres)
+        if term is not None:
+            query = query.filter(_search_condition(model, term))
+        query = filter_genres(query, model, genres, match)
+
+        if _is_postgres():
+            subquery = query.subquery()
+            rows = db.session.query(subquery.c.genre, func.count()).group_by(subquery.c.genre)
+            counts = dict(rows.all())
+        else:
+            # No unnest here: count the decoded lists
+            counts = Counter(genre for (record_genres,) in query for genre in record_genres or ())
+        return [(genre, counts.get(genre, 0)) for genre in GENRES]
+
+    if term is not None or not version:
+        return compute()
+    return cache.fetch(f'facets:{tag}:{match}:{"|".join(sorted(genres))}:{version}', [tag], compute)
+
+
+def search_records(model, term, genres=(), match='all'):
+    # Match the term against name, city and state. On Postgres the ILIKE
+    # filters are served by the pg_trgm GIN indexes declared on the models
+    # and results are ranked by trigram similarity; other databases (SQLite
+    # in local development) fall back to a plain LIKE scan ordered by name.
+    query = filter_genres(model.query.filter(_search_condition(model, term)), model, genres, match)
+
+    if _is_postgres() and term:
+        rank = func.greatest(
+            func.similarity(model.name, term),
+            func.similarity(model.city, term),
+            func.similarity(model.state, term),
+        )
+        return query.order_by(rank.desc(), model.id).all()
+
+    return query.order_by(model.name, model.id).all()
@@ -0,0 +1,127 @@
+import sys
+from datetime import datetime
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import case, func, select, update
+
+from models import cache, db, Artist, Show, Venue
+
+# Venue and Artist keep denormalized upcoming/past show counts plus the
+# start time of their next upcoming show. Creating a show adjusts them in
+# the same transaction; `flask stats roll` (run every minute from cron)
+# moves shows that have started from upcoming to past.
+stats_cli = AppGroup('stats', help='Maintain the denormalized show statistics.')
+
+STATS_TARGETS = ((Venue, Show.venue_id), (Artist, Show.artist_id))
+
+
+def _live_values(model, show_column, now):
+    # Correlated subqueries recomputing a row's statistics from Show
+    shows = select(func.count(Show.id)).where(show_column == model.id)
+    return {
+        'upcoming_shows_count': shows.where(Show.upcoming(now)).scalar_subquery(),
+        'past_shows_count': shows.where(Show.past(now)).scalar_subquery(),
+        'next_show_at': select(func.min(Show.start_time)).where(
+            show_column == model.id, Show.upcoming(now)
+        ).scalar_subquery(),
+    }
+
+
+def record_new_show(venue_id, artist_id, start_time):
+    # Count a show being inserted in the current transaction
+    now = datetime.now()
+    for model, record_id in ((Venue, venue_id), (Artist, artist_id)):
+        # Same rule as Show.upcoming
+        if start_time >= now:
+            values = {
+                'upcoming_shows_count': model.upcoming_shows_count + 1,
+                'next_show_at': case(
+                    (model.next_show_at.is_(None), start_time),
+                    (model.next_show_at > start_time, start_time),
+                    else_=model.next_show_at,
+                ),
+            }
+        else:
+            values = {'past_shows_count': model.past_shows_count + 1}
+        db.session.execute(update(model).where(model.id == record_id).values(**values))
+
+
+def refresh_show_stats(venue_ids=(), artist_ids=()):
+    # Recompute the statistics of the given rows in the current transaction
+    now = datetime.now()
+    for (model, show_column), ids in zip(STATS_TARGETS, (venue_ids, artist_ids)):
+        if ids:
+            db.session.execute(
+                update(model).where(model.id.in_(set(ids))).values(**_live_values(model, show_column, now))
+            )
+
+
+def roll_show_stats():
+    # Recompute only the rows whose next upcoming show has started
+    now = datetime.now()
+    rolled = 0
+    for model, show_column in STATS_TARGETS:
+        result = db.session.execute(
+            update(model).where(model.next_show_at < now).values(**_live_values(model, show_column, now))
+        )
+        rolled += result.rowcount
+    db.session.commit()
+    return rolled
+
+
+def rebuild_show_stats():
+    now = datetime.now()
+    for model, show_column in STATS_TARGETS:
+        db.session.execute(update(model).values(**_live_values(model, show_column, now)))
+    db.session.commit()
+
+
+def find_inconsistencies():
+    # Rows whose stored counts differ from live counts, one pass per table
+    now = datetime.now()
+    mismatches = []
+    for model, show_column in STATS_TARGETS:
+        live = select(
+            show_column.label('id'),
+            func.count(case((Show.upcoming(now), Show.id))).label('upcoming'),
+            func.count(case((Show.past(now), Show.id))).label('past'),
+        ).group_by(show_column).subquery()
+        upcoming = func.coalesce(live.c.upcoming, 0)
+        past = func.coalesce(live.c.past, 0)
+        rows = db.session.execute(
+            select(model.id, model.upcoming_shows_count, upcoming, model.past_shows_count, past)
+            .outerjoin(live, live.c.id == model.id)
+            .where((model.upcoming_shows_count != upcoming) | (model.past_shows_count != past))
+        ).all()
+        mismatches.extend((model.__name__, *row) for row in rows)
+    return mismatches
+
+
+@stats_cli.command('rebuild')
+def rebuild_command():
+    """Recompute every venue's and artist's show statistics."""
+    rebuild_show_stats()
+    cache.invalidate('venues', 'artists', 'shows')
+    click.echo('Show statistics rebuilt.')
+
+
+@stats_cli.command('roll')
+def roll_command():
+    """Move shows that have started from upcoming to past."""
+    rolled = roll_show_stats()
+    if rolled:
+        cache.invalidate('venues', 'artists', 'shows')
+    click.echo(f'{rolled} rows rolled forward.')
+
+
+@stats_cli.command('check')
+def check_command():
+    """Compare stored show statistics with live counts."""
+    mismatches = find_inconsistencies()
+    for model, record_id, upcoming, live_upcoming, past, live_past in mismatches:
+        click.echo(f'{model} {record_id}: upcoming {upcoming} (live {live_upcoming}), past {past} (live {live_past})')
+    if mismatches:
+        click.echo(f'{len(mismatches)} inconsistent rows.')
+        sys.exit(1)
+    click.echo('Show statistics are consistent.')
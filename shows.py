@@ -0,0 +1,143 @@
+from datetime import datetime
+
+from flask import Blueprint, abort, current_app, render_template, request, flash, redirect, url_for
+from sqlalchemy import func, select, tuple_
+
+from conditional import conditional
+from forms import ShowForm
+from models import cache, db, Artist, Show, Venue
+from replicas import replica_reads
+from scheduling import BookingError, book_show
+
+blueprint = Blueprint('shows', __name__)
+
+# Page versions for conditional GET, each read in a single statement. The
+# next upcoming start time is included because a page changes when that
+# show moves into the past. Venues and artists that have shows cannot be
+# deleted, so their latest updated_at (both indexed) covers every change
+# the feed can show, without counting the tables.
+def shows_page_version():
+  values = db.session.query(
+    select(func.max(Venue.updated_at)).scalar_subquery(),
+    select(func.max(Artist.updated_at)).scalar_subquery(),
+    select(func.max(Show.id)).scalar_subquery(),
+    select(func.max(Show.updated_at)).scalar_subquery(),
+    select(func.min(Show.start_time)).where(Show.upcoming(datetime.now())).scalar_subquery()
+  ).one()
+  return values
+
+def encode_show_cursor(segment, start_time, show_id):
+  return f"{segment}_{show_id}_{start_time.isoformat()}"
+
+def decode_show_cursor(cursor):
+  # Returns the feed segment and the (start_time, id) key to seek past
+  if not cursor:
+    return 'upcoming', None
+  try:
+    segment, show_id, start_time = cursor.split('_', 2)
+    if segment not in ('upcoming', 'past'):
+      raise ValueError(segment)
+    return segment, (datetime.fromisoformat(start_time), int(show_id))
+  except ValueError:
+    abort(400)
+
+#  GET ALL Shows
+@blueprint.route('/shows') 
+@replica_reads
+@conditional(shows_page_version)
+@cache.cached('shows', 'venues', 'artists')
+def shows():
+
+  # Shows are paged with a (start_time, id) keyset: upcoming shows first,
+  # soonest first, followed by past shows, most recent first
+  page_size = current_app.config['SHOWS_PAGE_SIZE']
+  segment, after = decode_show_cursor(request.args.get('cursor'))
+  now = datetime.now()
+
+  shows_in_db = db.session.query(
+    Show.id,
+    Show.start_time,
+    Venue.id,
+    Venue.name,
+    Artist.id,
+    Artist.name,
+    Artist.image_link
+  ).join(Venue, Show.venue_id == Venue.id).join(Artist, Show.artist_id == Artist.id)
+
+  # Fetch one row more than a page to know whether a next page exists
+  page = []
+  if segment == 'upcoming':
+    upcoming_shows = shows_in_db.filter(Show.upcoming(now))
+    if after:
+      upcoming_shows = upcoming_shows.filter(tuple_(Show.start_time, Show.id) > after)
+    upcoming_shows = upcoming_shows.order_by(Show.start_time, Show.id).limit(page_size + 1).all()
+    page.extend(('upcoming', show) for show in upcoming_shows)
+    after = None
+
+  if len(page) <= page_size:
+    past_shows = shows_in_db.filter(Show.past(now))
+    if after:
+      past_shows = past_shows.filter(tuple_(Show.start_time, Show.id) < after)
+    past_shows = past_shows.order_by(Show.start_time.desc(), Show.id.desc()).limit(page_size + 1 - len(page)).all()
+    page.extend(('past', show) for show in past_shows)
+
+  next_cursor = None
+  if len(page) > page_size:
+    page = page[:page_size]
+    last_segment, (last_show_id, last_start_time, *_) = page[-1]
+    next_cursor = encode_show_cursor(last_segment, last_start_time, last_show_id)
+
+  # Create data to send to front end
+  data = []
+  for _, (show_id, start_time, venue_id, venue_name, artist_id, artist_name, artist_image_link) in page:
+    event_data = {
+      "venue_id": venue_id,
+      "venue_name": venue_name,
+      "artist_id": artist_id,
+      "artist_name":artist_name,
+      "artist_image_link": artist_image_link,
+      "start_time": start_time
+    }
+    data.append(event_data)
+
+  # Send data to front end
+  return render_template('pages/shows.html', shows=data, next_cursor=next_cursor, first_page='cursor' not in request.args)
+
+# Create Shows
+@blueprint.route('/shows/create') 
+def create_shows():
+  # renders form. do not touch.
+  form = ShowForm()
+  return render_template('forms/new_show.html', form=form)
+
+# Create all Shows
+@blueprint.route('/shows/create', methods=['POST']) 
+def create_show_submission():
+  form = ShowForm(request.form)
+  if form.validate():
+    try:
+      show = book_show(form.artist_id.data, form.venue_id.data, form.start_time.data)
+      db.session.commit()
+      cache.invalidate('shows', f'venue:{show.venue_id}', f'artist:{show.artist_id}')
+      flash('Show was successfully listed!')
+
+    except BookingError as e:
+      db.session.rollback()
+      flash(f'Show could not be listed. {e}')
+      return redirect(url_for('shows.create_shows'))
+
+    except Exception as e:
+      db.session.rollback()
+      flash('An error occurred. Show could not be listed.')
+      print(f"Error: {e}")
+
+    finally:
+      db.session.close()
+  else:
+    for field_name, error_messages in form.errors.items():
+      for error in error_messages:
+        flash(f"Error in {field_name}: {error}")
+    return redirect(url_for('shows.create_show_submission'))
+
+  return redirect(url_for('index'))
+
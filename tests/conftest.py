@@ -0,0 +1,95 @@
+# Tests run against a throwaway SQLite database by default. Point
+# TEST_DATABASE_URL at an empty Postgres database to run the whole suite
+# there, including the tests that need Postgres (row locks, EXPLAIN plans):
+#
+#   TEST_DATABASE_URL=postgresql://localhost/fyyur_test python -m pytest
+import os
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from app import create_app
+from config import Config
+from models import db
+
+TEST_DATABASE_URL = os.getenv('TEST_DATABASE_URL')
+
+
+class TestConfig(Config):
+    TESTING = True
+    WTF_CSRF_ENABLED = False
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+    SQLALCHEMY_BINDS = {}
+    CACHE_TYPE = 'lru'
+    JINJA_BYTECODE_CACHE_DIR = ''
+    ASSETS_BUNDLED = False
+    QUERY_GUARD = None
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    # Builds an app on a fresh database; settings override TestConfig
+    apps = []
+
+    def make_app(**settings):
+        config = type('Config', (TestConfig,), {
+            'SQLALCHEMY_DATABASE_URI': TEST_DATABASE_URL or f'sqlite:///{tmp_path / "test.db"}',
+            'LOG_FILE': str(tmp_path / 'error.log'),
+            'SLOW_QUERY_LOG': str(tmp_path / 'slow_queries.log'),
+            **settings,
+        })
+        app = create_app(config)
+        # Tables on the primary only; replica tests fill their own binds
+        with app.app_context():
+            db.drop_all(bind_key=None)
+            db.create_all(bind_key=None)
+        apps.append(app)
+        return app
+
+    yield make_app
+
+    for app in apps:
+        with app.app_context():
+            db.session.remove()
+            db.drop_all(bind_key=None)
+            for engine in db.engines.values():
+                engine.dispose()
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def postgres():
+    if not (TEST_DATABASE_URL or '').startswith('postgresql'):
+        pytest.skip('needs TEST_DATABASE_URL pointing at Postgres')
+
+
+@pytest.fixture
+def capture_sql(app):
+    # with capture_sql() as statements: ... collects (statement, parameters)
+    # for everything sent to the primary database
+    @contextmanager
+    def capture_sql():
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append((statement, parameters))
+
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, 'before_cursor_execute', record)
+
+    return capture_sql
@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, update
+
+from models import db, Artist, Show, Venue
+
+
+@pytest.fixture
+def venue_id(app):
+    with app.app_context():
+        venue = Venue(name='Blue Note', genres=['Jazz'], city='New York', state='NY',
+                      address='131 W 3rd St', phone='555-555-5555', website='https://venue.example.com')
+        artist = Artist(name='Miles Davis', genres=['Jazz'], city='New York', state='NY')
+        db.session.add_all([venue, artist])
+        db.session.flush()
+        db.session.add(Show(venue_id=venue.id, artist_id=artist.id, start_time=datetime.now() + timedelta(days=7)))
+        db.session.commit()
+        return venue.id
+
+
+def test_unchanged_page_answers_304(client, venue_id):
+    response = client.get(f'/venues/{venue_id}')
+    assert response.status_code == 200
+    assert response.headers.get('Last-Modified') is None
+
+    response = client.get(f'/venues/{venue_id}', headers={'If-None-Match': response.headers['ETag']})
+    assert response.status_code == 304
+
+
+@pytest.mark.parametrize('change', ['rename', 'delete_show'])
+def test_change_without_invalidation_is_not_served_from_cache(app, client, venue_id, change):
+    # Writes made elsewhere (another worker, a CLI command) never reach this
+    # process's cache tags; the new ETag alone must bring a fresh body
+    first = client.get(f'/venues/{venue_id}')
+    assert b'Miles Davis' in first.data
+
+    with app.app_context():
+        if change == 'rename':
+            db.session.execute(update(Venue).where(Venue.id == venue_id).values(name='Village Vanguard'))
+        else:
+            db.session.execute(delete(Show).where(Show.venue_id == venue_id))
+        db.session.commit()
+
+    response = client.get(f'/venues/{venue_id}', headers={'If-None-Match': first.headers['ETag']})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != first.headers['ETag']
+    if change == 'rename':
+        assert b'Village Vanguard' in response.data
+    else:
+        assert b'Miles Davis' not in response.data
+
+    again = client.get(f'/venues/{venue_id}', headers={'If-None-Match': response.headers['ETag']})
+    assert again.status_code == 304
@@ -0,0 +1,52 @@
+import pytest
+
+from models import db, Artist, Venue
+
+VENUE_FORM = {'name': 'Blue Note', 'city': 'New York', 'state': 'NY', 'address': '131 W 3rd St',
+              'phone': '555-555-5555', 'genres': 'Jazz', 'website_link': 'https://venue.example.com',
+              'facebook_link': 'https://www.facebook.com/venue', 'image_link': '', 'seeking_description': ''}
+
+ARTIST_FORM = {'name': 'Miles Davis', 'city': 'New York', 'state': 'NY', 'phone': '555-555-5555',
+               'genres': 'Jazz', 'website_link': 'https://artist.example.com',
+               'facebook_link': 'https://www.facebook.com/artist', 'image_link': '', 'seeking_description': ''}
+
+
+@pytest.fixture
+def venue_id(app, client):
+    client.post('/venues/create', data=VENUE_FORM)
+    with app.app_context():
+        return db.session.query(Venue.id).scalar()
+
+
+@pytest.fixture
+def artist_id(app, client):
+    client.post('/artists/create', data=ARTIST_FORM)
+    with app.app_context():
+        return db.session.query(Artist.id).scalar()
+
+
+def test_venue_edit_saves_genres_and_seeking_talent(app, client, venue_id):
+    response = client.post(f'/venues/{venue_id}/edit',
+                           data={**VENUE_FORM, 'genres': ['Blues', 'Soul'], 'seeking_talent': 'y'})
+    assert response.status_code == 302
+
+    with app.app_context():
+        venue = db.session.get(Venue, venue_id)
+        assert venue.genres == ['Blues', 'Soul']
+        assert venue.seeking_talent is True
+
+
+def test_artist_edit_saves_genres(app, client, artist_id):
+    response = client.post(f'/artists/{artist_id}/edit', data={**ARTIST_FORM, 'genres': 'Blues'})
+    assert response.status_code == 302
+
+    with app.app_context():
+        assert db.session.get(Artist, artist_id).genres == ['Blues']
+
+
+@pytest.mark.parametrize('kind, form', [('venues', VENUE_FORM), ('artists', ARTIST_FORM)])
+def test_invalid_edit_returns_to_the_form(app, client, venue_id, artist_id, kind, form):
+    record_id = venue_id if kind == 'venues' else artist_id
+    response = client.post(f'/{kind}/{record_id}/edit', data={**form, 'name': ''})
+    assert response.status_code == 302
+    assert response.headers['Location'] == f'/{kind}/{record_id}/edit'
@@ -0,0 +1,32 @@
+from sqlalchemy import update
+
+from models import cache, db, Venue
+
+VENUE = {'city': 'New York', 'state': 'NY', 'address': '131 W 3rd St',
+         'phone': '555-555-5555', 'website': 'https://venue.example.com'}
+
+
+def test_facets_follow_changes_made_elsewhere(app, client):
+    with app.app_context():
+        db.session.add(Venue(name='Blue Note', genres=['Jazz'], **VENUE))
+        db.session.commit()
+    assert b'Jazz (1)' in client.get('/venues').data
+
+    # Another worker edits the venue: this process's tags never move
+    with app.app_context():
+        db.session.execute(update(Venue).values(genres=['Blues']))
+        db.session.commit()
+
+    page = client.get('/venues').data
+    assert b'Blues (1)' in page
+    assert b'Jazz (1)' not in page
+
+
+def test_search_facets_are_not_cached(app, client):
+    with app.app_context():
+        db.session.add(Venue(name='Blue Note', genres=['Jazz'], **VENUE))
+        db.session.commit()
+
+    for term in ('Blue', 'Note', 'anything else'):
+        client.post('/venues/search', data={'search_term': term})
+    assert not [key for key in cache.backend._entries if key.startswith('value:facets')]
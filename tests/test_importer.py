@@ -0,0 +1,62 @@
+import csv
+import json
+
+import pytest
+
+from models import db, Artist, Venue
+
+VENUE = {
+    'name': 'Blue Note', 'city': 'New York', 'state': 'NY', 'address': '131 W 3rd St',
+    'phone': '555-555-5555', 'genres': 'Jazz;Blues', 'website': 'https://venue.example.com',
+    'facebook_link': 'https://www.facebook.com/venue', 'image_link': '', 'seeking_description': '',
+}
+
+ARTIST = {
+    'name': 'Miles Davis', 'city': 'New York', 'state': 'NY', 'phone': '555-555-5555',
+    'genres': 'Jazz', 'website': 'https://artist.example.com',
+    'facebook_link': 'https://www.facebook.com/artist', 'image_link': '', 'seeking_description': '',
+}
+
+SPELLINGS = [
+    ('False', False), ('FALSE', False), ('0', False), ('no', False), ('', False),
+    ('True', True), ('TRUE', True), ('1', True), ('yes', True), ('y', True),
+]
+
+
+def import_csv(app, tmp_path, record_type, rows):
+    path = tmp_path / f'{record_type}.csv'
+    with open(path, 'w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    errors_path = tmp_path / f'{record_type}.rejected.jsonl'
+    result = app.test_cli_runner().invoke(args=['import', record_type, str(path), '--errors', str(errors_path)])
+    assert result.exit_code == 0, result.output
+    return [json.loads(line) for line in errors_path.read_text().splitlines()]
+
+
+@pytest.mark.parametrize('model, row, field', [(Venue, VENUE, 'seeking_talent'), (Artist, ARTIST, 'seeking_venue')])
+def test_csv_booleans(app, tmp_path, model, row, field):
+    rows = [{**row, 'name': f'{row["name"]} {index}', field: spelling} for index, (spelling, _) in enumerate(SPELLINGS)]
+    rejected = import_csv(app, tmp_path, model.__tablename__.lower() + 's', rows)
+    assert rejected == []
+
+    with app.app_context():
+        imported = dict(db.session.query(model.name, getattr(model, field)))
+    assert imported == {f'{row["name"]} {index}': expected for index, (_, expected) in enumerate(SPELLINGS)}
+
+
+def test_rejected_rows_are_reported(app, tmp_path):
+    rows = [
+        {**VENUE, 'seeking_talent': 'no'},
+        {**VENUE, 'name': 'Maybe', 'seeking_talent': 'maybe'},
+        {**VENUE, 'name': '', 'seeking_talent': 'yes'},
+        {**VENUE, 'name': 'No Genres', 'genres': '', 'seeking_talent': '0'},
+    ]
+    rejected = import_csv(app, tmp_path, 'venues', rows)
+
+    assert [(entry['line'], sorted(entry['errors'])) for entry in rejected] == [
+        (3, ['seeking_talent']), (4, ['name']), (5, ['genres']),
+    ]
+    with app.app_context():
+        assert [name for (name,) in db.session.query(Venue.name)] == ['Blue Note']
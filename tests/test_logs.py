@@ -0,0 +1,55 @@
+import json
+import logging
+import os
+from logging.handlers import WatchedFileHandler
+
+import logs
+
+
+def test_file_reopened_after_external_rotation(app, tmp_path):
+    path = tmp_path / 'app.log'
+    logger = logging.getLogger('fyyur.test.rotation')
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    listener = logs.add_queued_file_handler(app, logger, str(path))
+    try:
+        assert all(isinstance(handler, WatchedFileHandler) for handler in listener.handlers)
+
+        logger.info('before rotation')
+        listener.stop()
+        # What logrotate does: move the file away, leaving the path free
+        os.rename(path, tmp_path / 'app.log.1')
+        listener.start()
+        logger.info('after rotation')
+        listener.stop()
+
+        rotated = [json.loads(line)['message'] for line in (tmp_path / 'app.log.1').read_text().splitlines()]
+        current = [json.loads(line)['message'] for line in path.read_text().splitlines()]
+        assert rotated == ['before rotation']
+        assert current == ['after rotation']
+    finally:
+        for handler in logger.handlers[:]:
+            logger.removeHandler(handler)
+        for handler in listener.handlers:
+            handler.close()
+
+
+def test_fork_hook_registered_once(app, tmp_path, monkeypatch):
+    # One module-level hook restarts every listener, however many handlers
+    # are added after import
+    registered = []
+    monkeypatch.setattr(os, 'register_at_fork', lambda **hooks: registered.append(hooks))
+    logger = logging.getLogger('fyyur.test.fork')
+    logger.propagate = False
+    starters = len(logs._listener_starters)
+    listeners = [logs.add_queued_file_handler(app, logger, str(tmp_path / f'{n}.log')) for n in range(3)]
+    try:
+        assert registered == []
+        assert len(logs._listener_starters) == starters + 3
+    finally:
+        for listener in listeners:
+            listener.stop()
+            for handler in listener.handlers:
+                handler.close()
+        for handler in logger.handlers[:]:
+            logger.removeHandler(handler)
@@ -0,0 +1,100 @@
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from flask_migrate import Migrate, downgrade, upgrade
+from sqlalchemy import column, inspect, select, table, text
+
+from models import db, GENRE_LIST
+
+MIGRATIONS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+
+@pytest.fixture
+def migrated_app(app):
+    # The schema as built by `flask db upgrade` instead of create_all()
+    Migrate(app, db, directory=MIGRATIONS)
+    with app.app_context():
+        db.drop_all(bind_key=None)
+        upgrade()
+    yield app
+    with app.app_context():
+        downgrade(revision='base')
+        db.session.execute(text('DROP TABLE alembic_version'))
+        db.session.commit()
+
+
+def test_upgrade_creates_trigram_indexes(migrated_app):
+    with migrated_app.app_context():
+        inspector = inspect(db.engine)
+        for table in ('Venue', 'Artist'):
+            indexes = {index['name'] for index in inspector.get_indexes(table)}
+            assert {f'ix_{table.lower()}_{column}_trgm' for column in ('name', 'city', 'state')} <= indexes
+
+
+
+def test_upgrade_fills_in_show_statistics(app):
+    # Rows created before the statistics columns existed get their counts
+    Migrate(app, db, directory=MIGRATIONS)
+    now = datetime.now()
+    venue = table('Venue', *(column(name) for name in ('id', 'name', 'city', 'state', 'address', 'phone', 'website', 'seeking_talent')),
+                  column('genres', GENRE_LIST))
+    artist = table('Artist', column('id'), column('name'))
+    show = table('Show', column('artist_id'), column('venue_id'), column('start_time'))
+    with app.app_context():
+        db.drop_all(bind_key=None)
+        upgrade(revision='1e9b6d3f7c28')
+        db.session.execute(venue.insert().values(
+            id=1, name='Blue Note', genres=['Jazz'], city='New York', state='NY', address='1 Main Street',
+            phone='555-555-5555', website='https://venue.example.com', seeking_talent=False
+        ))
+        db.session.execute(artist.insert().values(id=1, name='Miles Davis'))
+        db.session.execute(show.insert(), [
+            {'artist_id': 1, 'venue_id': 1, 'start_time': now + timedelta(days=days)} for days in (-1, 1, 2)
+        ])
+        db.session.commit()
+
+        upgrade()
+        stats = (column('upcoming_shows_count'), column('past_shows_count'), column('next_show_at', db.DateTime))
+        venue_stats = db.session.execute(select(*stats).select_from(venue)).one()
+        artist_stats = db.session.execute(select(*stats).select_from(artist)).one()
+        db.session.rollback()
+
+        downgrade(revision='base')
+        db.session.execute(text('DROP TABLE alembic_version'))
+        db.session.commit()
+
+    assert tuple(venue_stats) == (2, 1, now + timedelta(days=1))
+    assert tuple(artist_stats) == (2, 1, now + timedelta(days=1))
+
+
+def test_migrations_match_the_models(migrated_app):
+    # The head revision builds the same schema as create_all()
+    with migrated_app.app_context():
+        with db.engine.connect() as connection:
+            assert compare_metadata(MigrationContext.configure(connection), db.metadata) == []
+
+
+def test_upgrade_adopts_tables_created_before_migrations(app):
+    # A database built by the original create_all() has the tables but no
+    # alembic_version; `flask db upgrade` must carry it to head
+    Migrate(app, db, directory=MIGRATIONS)
+    artist = table('Artist', column('id'), column('name'))
+    with app.app_context():
+        db.drop_all(bind_key=None)
+        upgrade(revision='3f1c2a9d4e57')
+        db.session.execute(text('DROP TABLE alembic_version'))
+        db.session.execute(artist.insert().values(id=1, name='Miles Davis'))
+        db.session.commit()
+
+        upgrade()
+        names = db.session.execute(select(artist.c.name)).scalars().all()
+        db.session.rollback()
+
+        downgrade(revision='base')
+        db.session.execute(text('DROP TABLE alembic_version'))
+        db.session.commit()
+
+    assert names == ['Miles Davis']
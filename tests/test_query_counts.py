@@ -0,0 +1,46 @@
+import pytest
+
+from benchmarks.seed import seed
+
+VENUES = 10
+
+
+@pytest.fixture
+def app(make_app):
+    # No response or value cache, so every request reaches the database
+    return make_app(CACHE_TYPE='none')
+
+
+def count_statements(client, capture_sql, method, url, **kwargs):
+    with capture_sql() as statements:
+        response = client.open(url, method=method, **kwargs)
+    assert response.status_code == 200
+    return len(statements)
+
+
+def test_venues_page_statements_do_not_grow_with_venues(app, client, capture_sql):
+    with app.app_context():
+        seed(venues=VENUES, artists=VENUES, shows=5 * VENUES)
+    few = count_statements(client, capture_sql, 'GET', '/venues')
+
+    with app.app_context():
+        seed(venues=9 * VENUES, artists=0, shows=0)
+    many = count_statements(client, capture_sql, 'GET', '/venues')
+
+    assert few > 0
+    assert many == few
+
+
+@pytest.mark.parametrize('url, term', [('/venues/search', 'Venue'), ('/artists/search', 'Artist')])
+def test_search_statements_do_not_grow_with_matches(app, client, capture_sql, url, term):
+    # The term matches every seeded name, so the result list grows tenfold
+    with app.app_context():
+        seed(venues=VENUES, artists=VENUES, shows=5 * VENUES)
+    few = count_statements(client, capture_sql, 'POST', url, data={'search_term': term})
+
+    with app.app_context():
+        seed(venues=9 * VENUES, artists=9 * VENUES, shows=0)
+    many = count_statements(client, capture_sql, 'POST', url, data={'search_term': term})
+
+    assert few > 0
+    assert many == few
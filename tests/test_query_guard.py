@@ -0,0 +1,59 @@
+import pytest
+from flask import render_template_string
+
+from models import db, Venue
+from query_guard import LazyLoadError, no_lazy_loads
+
+
+@pytest.fixture
+def guarded_app(make_app):
+    app = make_app(QUERY_GUARD='raise')
+    with app.app_context():
+        db.session.add(Venue(name='Blue Note', genres=['Jazz'], city='New York', state='NY',
+                             address='131 W 3rd St', phone='555-555-5555', website='https://venue.example.com'))
+        db.session.commit()
+    return app
+
+
+class _VenueRef:
+    # A repr that looks the row up, as found in log messages
+    def __init__(self, venue_id):
+        self.venue_id = venue_id
+
+    def __repr__(self):
+        return f'<Venue {db.session.get(Venue, self.venue_id).name}>'
+
+
+def test_get_inside_block_is_flagged(guarded_app):
+    with guarded_app.app_context():
+        with no_lazy_loads('test'), pytest.raises(LazyLoadError):
+            Venue.query.get(1)
+
+
+def test_expired_attribute_refresh_is_flagged(guarded_app):
+    with guarded_app.app_context():
+        venue = db.session.get(Venue, 1)
+        db.session.expire(venue)
+        with no_lazy_loads('test'), pytest.raises(LazyLoadError):
+            venue.name
+
+
+def test_expired_attribute_in_template_is_flagged(guarded_app):
+    with guarded_app.test_request_context():
+        venue = db.session.get(Venue, 1)
+        db.session.commit()
+        with pytest.raises(LazyLoadError, match='rendering'):
+            render_template_string('{{ venue.name }}', venue=venue)
+
+
+def test_query_in_logged_repr_is_flagged(guarded_app):
+    with guarded_app.app_context():
+        with pytest.raises(LazyLoadError, match='logging'):
+            guarded_app.logger.warning('checking %r', _VenueRef(1))
+
+
+def test_queries_outside_blocks_pass(guarded_app):
+    with guarded_app.app_context():
+        venue = db.session.get(Venue, 1)
+        db.session.expire(venue)
+        assert venue.name == 'Blue Note'
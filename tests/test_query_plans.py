@@ -0,0 +1,66 @@
+# EXPLAIN the statements the main routes send and check that the big Show
+# table is read through the indexes meant for them, and that no table is
+# scanned in full unless the page lists all of its rows.
+# Needs Postgres: SQLite plans say nothing about production.
+import pytest
+from sqlalchemy import text
+
+from benchmarks.seed import seed
+from models import db, Artist, Venue
+
+INDEX_SCANS = {'Index Scan', 'Index Only Scan', 'Bitmap Index Scan'}
+
+
+@pytest.fixture
+def seeded_app(app, postgres):
+    with app.app_context():
+        seed(venues=3000, artists=3000, shows=30000)
+        db.session.execute(text('ANALYZE'))
+        db.session.commit()
+    return app
+
+
+def scans(plan):
+    # (node type, table, index) for every node of an EXPLAIN (FORMAT JSON) plan
+    yield plan['Node Type'], plan.get('Relation Name'), plan.get('Index Name')
+    for child in plan.get('Plans', ()):
+        yield from scans(child)
+
+
+def route_plans(app, capture_sql, path):
+    with capture_sql() as statements:
+        assert app.test_client().get(path).status_code == 200
+    with app.app_context():
+        connection = db.session.connection()
+        return [
+            (statement, list(scans(connection.exec_driver_sql(
+                'EXPLAIN (FORMAT JSON) ' + statement, parameters
+            ).scalar()[0]['Plan'])))
+            for statement, parameters in statements
+        ]
+
+
+def first_id(app, model):
+    with app.app_context():
+        return db.session.query(db.func.min(model.id)).scalar()
+
+
+@pytest.mark.parametrize('path, model, index, not_scanned', [
+    ('/venues/{id}', Venue, 'ix_show_venue_id_start_time', ('Show', 'Venue', 'Artist')),
+    ('/artists/{id}', Artist, 'ix_show_artist_id_start_time', ('Show', 'Venue', 'Artist')),
+    ('/shows', None, 'ix_show_start_time_id', ('Show', 'Venue', 'Artist')),
+    # The area listing reads every venue, which a sequential scan of Venue
+    # does best; only its version query touches Show
+    ('/venues', None, 'ix_show_start_time_id', ('Show',)),
+])
+def test_route_reads_shows_through_indexes(seeded_app, capture_sql, path, model, index, not_scanned):
+    path = path.format(id=first_id(seeded_app, model)) if model else path
+    plans = route_plans(seeded_app, capture_sql, path)
+
+    used = set()
+    for statement, nodes in plans:
+        for table in not_scanned:
+            assert ('Seq Scan', table, None) not in nodes, statement
+        used.update(index_name for node_type, table, index_name in nodes
+                    if node_type in INDEX_SCANS and table == 'Show' or node_type == 'Bitmap Index Scan')
+    assert index in used
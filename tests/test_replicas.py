@@ -0,0 +1,72 @@
+import pytest
+
+from models import cache, db, Venue
+from replicas import PIN_COOKIE
+
+# Reads are told apart by giving the replica a venue the primary lacks
+VENUE = {'genres': ['Jazz'], 'city': 'New York', 'state': 'NY', 'address': '1 Main Street',
+         'phone': '555-555-5555', 'website': 'https://venue.example.com'}
+
+VENUE_FORM = {'name': 'New Venue', 'city': 'New York', 'state': 'NY', 'address': '1 Main Street',
+              'phone': '555-555-5555', 'genres': 'Jazz', 'website_link': 'https://venue.example.com',
+              'facebook_link': 'https://www.facebook.com/venue', 'image_link': '', 'seeking_description': ''}
+
+
+@pytest.fixture
+def make_replicated_app(make_app, tmp_path):
+    def make_replicated_app(replica_url=None):
+        app = make_app(
+            SQLALCHEMY_DATABASE_URI=f'sqlite:///{tmp_path / "primary.db"}',
+            SQLALCHEMY_BINDS={'replica_0': replica_url or f'sqlite:///{tmp_path / "replica.db"}'},
+        )
+        with app.app_context():
+            db.session.add(Venue(name='Primary Venue', **VENUE))
+            db.session.commit()
+            if replica_url is None:
+                replica = db.engines['replica_0']
+                db.metadata.create_all(replica)
+                with replica.begin() as connection:
+                    connection.execute(Venue.__table__.insert(), [{'name': 'Replica Venue', **VENUE}])
+        return app
+    return make_replicated_app
+
+
+def test_reads_go_to_the_replica(make_replicated_app):
+    client = make_replicated_app().test_client()
+    page = client.get('/venues').data
+    assert b'Replica Venue' in page
+    assert b'Primary Venue' not in page
+
+
+def test_writes_pin_the_client_to_the_primary(make_replicated_app):
+    client = make_replicated_app().test_client()
+    response = client.post('/venues/create', data=VENUE_FORM)
+    assert response.status_code == 302
+    assert client.get_cookie(PIN_COOKIE) is not None
+
+    page = client.get('/venues').data
+    assert b'New Venue' in page
+    assert b'Replica Venue' not in page
+
+
+def test_unhealthy_replica_falls_back_to_the_primary(make_replicated_app, tmp_path):
+    app = make_replicated_app(f'sqlite:///{tmp_path / "missing" / "replica.db"}')
+    page = app.test_client().get('/venues').data
+    assert b'Primary Venue' in page
+
+
+def test_replica_reads_after_a_write_are_not_cached(make_replicated_app):
+    app = make_replicated_app()
+    writer = app.test_client()
+    writer.post('/venues/create', data=VENUE_FORM)
+
+    # Another client still reads the lagging replica; that copy must not be
+    # stored under the new version of the 'venues' tag
+    reader = app.test_client()
+    assert b'New Venue' not in reader.post('/venues/search', data={'search_term': 'Venue'}).data
+    assert not [key for key in cache.backend._entries if key.startswith('view:')]
+
+    cache.replica_lag = 0
+    cache.backend.clear()
+    reader.post('/venues/search', data={'search_term': 'Venue'})
+    assert [key for key in cache.backend._entries if key.startswith('view:')]
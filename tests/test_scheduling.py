@@ -0,0 +1,132 @@
+import io
+import json
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from importer import RECORD_TYPES, import_batch
+from models import db, Artist, Show, Venue
+from scheduling import BookingError, book_show, find_conflicts
+
+START = datetime(2030, 5, 1, 20, 0)
+
+
+@pytest.fixture
+def records(app):
+    with app.app_context():
+        venues = [Venue(name=f'Venue {index}', genres=['Jazz'], city='New York', state='NY',
+                        address='1 Main Street', phone='555-555-5555', website='https://venue.example.com')
+                  for index in range(2)]
+        artists = [Artist(name=f'Artist {index}', genres=['Jazz'], city='New York', state='NY')
+                   for index in range(2)]
+        db.session.add_all(venues + artists)
+        db.session.commit()
+        return [venue.id for venue in venues], [artist.id for artist in artists]
+
+
+def show_count(app):
+    with app.app_context():
+        return db.session.query(Show).count()
+
+
+def test_book_show_rejects_overlaps(app, records):
+    (venue_id, other_venue_id), (artist_id, other_artist_id) = records
+    with app.app_context():
+        book_show(artist_id, venue_id, START)
+        db.session.commit()
+
+        with pytest.raises(BookingError, match='Venue'):
+            book_show(other_artist_id, venue_id, START + timedelta(minutes=90))
+        with pytest.raises(BookingError, match='Artist'):
+            book_show(artist_id, other_venue_id, START - timedelta(minutes=90))
+        db.session.rollback()
+
+        # Back-to-back slots do not overlap
+        book_show(other_artist_id, venue_id, START + timedelta(minutes=120))
+        db.session.commit()
+    assert show_count(app) == 2
+
+
+def test_book_show_validates_ids(app, records):
+    (venue_id, _), (artist_id, _) = records
+    with app.app_context():
+        with pytest.raises(BookingError, match='numbers'):
+            book_show('x', venue_id, START)
+        with pytest.raises(BookingError, match='Venue 999'):
+            book_show(artist_id, 999, START)
+        with pytest.raises(BookingError, match='Artist 999'):
+            book_show(999, venue_id, START)
+
+
+def test_find_conflicts_within_a_batch(app, records):
+    (venue_id, other_venue_id), (artist_id, other_artist_id) = records
+    with app.app_context():
+        conflicts = find_conflicts([
+            (artist_id, venue_id, START),
+            (other_artist_id, venue_id, START + timedelta(minutes=30)),
+            (artist_id, other_venue_id, START + timedelta(minutes=60)),
+            (other_artist_id, other_venue_id, START + timedelta(days=1)),
+        ])
+    assert sorted(conflicts) == [1, 2]
+
+
+def test_import_rejects_double_bookings(app, records):
+    (venue_id, other_venue_id), (artist_id, other_artist_id) = records
+    with app.app_context():
+        book_show(artist_id, venue_id, START)
+        db.session.commit()
+
+    def row(artist, venue, start_time):
+        return {'artist_id': artist, 'venue_id': venue, 'start_time': start_time.strftime('%Y-%m-%d %H:%M:%S')}
+
+    batch = list(enumerate([
+        row(other_artist_id, venue_id, START + timedelta(minutes=60)),
+        row(other_artist_id, other_venue_id, START + timedelta(days=1)),
+        row(artist_id, other_venue_id, START + timedelta(days=1, minutes=30)),
+        row(artist_id, other_venue_id, START + timedelta(days=2)),
+    ], start=1))
+    rejected = io.StringIO()
+    with app.test_request_context():
+        imported = import_batch(*RECORD_TYPES['shows'], batch, rejected)
+
+    assert imported == 2
+    assert [json.loads(line)['line'] for line in rejected.getvalue().splitlines()] == [1, 3]
+    assert show_count(app) == 3
+
+
+def test_parallel_bookings_of_one_slot(app, records, postgres):
+    # Concurrent submissions for the same venue and time: the venue row lock
+    # lets exactly one of them through
+    (venue_id, _), _ = records
+    with app.app_context():
+        artist_ids = [artist.id for artist in db.session.query(Artist.id)]
+        for index in range(len(artist_ids), 8):
+            artist = Artist(name=f'Artist {index}', genres=['Jazz'], city='New York', state='NY')
+            db.session.add(artist)
+            db.session.flush()
+            artist_ids.append(artist.id)
+        db.session.commit()
+
+    barrier = threading.Barrier(len(artist_ids))
+    results = []
+
+    def submit(artist_id):
+        with app.app_context():
+            barrier.wait()
+            try:
+                book_show(artist_id, venue_id, START + timedelta(minutes=artist_ids.index(artist_id)))
+                db.session.commit()
+                results.append('booked')
+            except BookingError:
+                db.session.rollback()
+                results.append('rejected')
+
+    threads = [threading.Thread(target=submit, args=(artist_id,)) for artist_id in artist_ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(results) == ['booked'] + ['rejected'] * (len(artist_ids) - 1)
+    assert show_count(app) == 1
@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import artists
+import show_stats
+import shows
+import venues
+from models import db, Artist, Show, Venue
+
+NOW = datetime(2030, 6, 1, 20, 0)
+
+
+class FrozenDatetime(datetime):
+    now = classmethod(lambda cls, tz=None: cls._now)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # Every module that decides what "now" is reads the same frozen clock
+    FrozenDatetime._now = NOW
+    for module in (show_stats, venues, artists, shows):
+        monkeypatch.setattr(module, 'datetime', FrozenDatetime)
+    return FrozenDatetime
+
+
+@pytest.fixture
+def show_at_now(app, clock):
+    with app.app_context():
+        venue = Venue(name='Blue Note', genres=['Jazz'], city='New York', state='NY', address='131 W 3rd St',
+                      phone='555-555-5555', website='https://venue.example.com')
+        artist = Artist(name='Miles Davis', genres=['Jazz'], city='New York', state='NY')
+        db.session.add_all([venue, artist])
+        db.session.flush()
+        db.session.add(Show(venue_id=venue.id, artist_id=artist.id, start_time=NOW))
+        show_stats.record_new_show(venue.id, artist.id, NOW)
+        db.session.commit()
+        return venue.id, artist.id
+
+
+def test_show_starting_now_is_upcoming_everywhere(app, client, show_at_now):
+    venue_id, artist_id = show_at_now
+    with app.app_context():
+        assert show_stats.find_inconsistencies() == []
+        assert show_stats.roll_show_stats() == 0
+        for model, record_id in ((Venue, venue_id), (Artist, artist_id)):
+            record = db.session.get(model, record_id)
+            assert (record.upcoming_shows_count, record.past_shows_count, record.next_show_at) == (1, 0, NOW)
+
+        show_stats.rebuild_show_stats()
+        assert db.session.get(Venue, venue_id).upcoming_shows_count == 1
+
+    for path in (f'/venues/{venue_id}', f'/artists/{artist_id}'):
+        page = client.get(path).data
+        assert b'1 Upcoming Show' in page
+        assert b'0 Past Shows' in page
+
+
+def test_show_moves_to_past_once_its_start_is_behind_now(app, client, clock, show_at_now):
+    venue_id, artist_id = show_at_now
+    clock._now = NOW + timedelta(microseconds=1)
+    with app.app_context():
+        assert show_stats.find_inconsistencies()
+        assert show_stats.roll_show_stats() == 2
+        assert show_stats.find_inconsistencies() == []
+        venue = db.session.get(Venue, venue_id)
+        assert (venue.upcoming_shows_count, venue.past_shows_count, venue.next_show_at) == (0, 1, None)
+
+    page = client.get(f'/venues/{venue_id}').data
+    assert b'0 Upcoming Shows' in page
+    assert b'1 Past Show' in page
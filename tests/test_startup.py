@@ -0,0 +1,30 @@
+import os
+import statistics
+import subprocess
+import sys
+
+from benchmarks.startup import ROOT, run_once
+
+# Median of import + create_app() in a fresh interpreter; about 550 ms
+# locally, with headroom for slower CI machines
+STARTUP_BUDGET_MS = float(os.getenv('STARTUP_BUDGET_MS', 1000))
+
+
+def test_startup_within_budget(monkeypatch, tmp_path):
+    monkeypatch.setenv('DATABASE_URL', f'sqlite:///{tmp_path / "startup.db"}')
+    median_ms = statistics.median(wall for wall, _ in (run_once() for _ in range(3)))
+    assert median_ms <= STARTUP_BUDGET_MS
+
+
+def test_dotenv_loaded_before_metrics(tmp_path):
+    multiproc_dir = tmp_path / 'prometheus'
+    multiproc_dir.mkdir()
+    (tmp_path / '.env').write_text(f'PROMETHEUS_MULTIPROC_DIR={multiproc_dir}\n')
+    env = {name: value for name, value in os.environ.items() if name != 'PROMETHEUS_MULTIPROC_DIR'}
+    env['PYTHONPATH'] = ROOT
+
+    result = subprocess.run(
+        [sys.executable, '-c', 'import app, metrics; print(metrics.MULTIPROCESS)'],
+        cwd=tmp_path, env=env, capture_output=True, text=True, check=True,
+    )
+    assert result.stdout.strip() == 'True'
@@ -0,0 +1,22 @@
+from flask import render_template
+
+from models import db, Venue
+
+
+def test_compiled_templates_are_cached_on_disk(make_app, tmp_path):
+    directory = tmp_path / 'jinja'
+    app = make_app(JINJA_BYTECODE_CACHE_DIR=str(directory))
+    with app.app_context():
+        db.session.add(Venue(name='Blue Note', genres=['Jazz'], city='New York', state='NY',
+                             address='131 W 3rd St', phone='555-555-5555', website='https://venue.example.com'))
+        db.session.commit()
+
+    assert b'Blue Note' in app.test_client().get('/venues').data
+    cached = {path: path.stat().st_mtime_ns for path in directory.iterdir()}
+    assert cached
+
+    # A new app loads the compiled code instead of recompiling it
+    app = make_app(JINJA_BYTECODE_CACHE_DIR=str(directory))
+    with app.test_request_context():
+        render_template('pages/venues.html', areas=[], facets=[], selected_genres=[], match='all')
+    assert {path: path.stat().st_mtime_ns for path in directory.iterdir()} == cached
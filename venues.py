@@ -0,0 +1,329 @@
+import sys
+from datetime import datetime
+
+from flask import Blueprint, jsonify, render_template, request, flash, redirect, url_for
+from sqlalchemy import func, select
+
+from autocomplete import venue_index
+from conditional import conditional
+from forms import VenueForm
+from models import cache, db, Artist, Show, Venue
+from replicas import replica_reads
+from search import filter_genres, genre_facets, requested_genres, search_records
+
+blueprint = Blueprint('venues', __name__)
+
+# Page versions for conditional GET, each read in a single statement. The
+# next upcoming start time is included because a page changes when that
+# show moves into the past.
+def venues_page_version():
+  values = db.session.query(
+    select(func.count(Venue.id)).scalar_subquery(),
+    select(func.max(Venue.updated_at)).scalar_subquery(),
+    select(func.max(Show.id)).scalar_subquery(),
+    select(func.max(Show.updated_at)).scalar_subquery(),
+    select(func.min(Show.start_time)).where(Show.upcoming(datetime.now())).scalar_subquery()
+  ).one()
+  return values
+
+def venue_page_version(venue_id):
+  venue_shows = Show.venue_id == venue_id
+  values = db.session.query(
+    select(Venue.updated_at).where(Venue.id == venue_id).scalar_subquery(),
+    select(func.count(Show.id)).where(venue_shows).scalar_subquery(),
+    select(func.max(Show.updated_at)).where(venue_shows).scalar_subquery(),
+    select(func.max(Artist.updated_at)).join(Show, Show.artist_id == Artist.id).where(venue_shows).scalar_subquery(),
+    select(func.min(Show.start_time)).where(venue_shows, Show.upcoming(datetime.now())).scalar_subquery()
+  ).one()
+  if values[0] is None:
+    return None
+  return values
+
+#  Venues page Controller
+@blueprint.route('/venues')  
+@replica_reads
+@conditional(venues_page_version)
+@cache.cached('venues', 'shows')
+def venues():
+
+  # Query table to get venues, optionally filtered by genre
+  genres, match = requested_genres()
+  venues_in_db = filter_genres(db.session.query(
+    Venue.id, Venue.name, Venue.city, Venue.state, Venue.upcoming_shows_count
+  ), Venue, genres, match).order_by(Venue.city, Venue.state, Venue.id).all()
+  data = []
+
+  # Create a dictionary to group venues by (city, state)
+  grouped_venues = {}
+
+  # Create data to send to Front-End
+  for venue in venues_in_db:
+    venue_data = {
+      "id": venue.id,
+      "name": venue.name,
+      "num_upcoming_shows": venue.upcoming_shows_count
+    }
+
+    # Group venues by city and state
+    key = (venue.city, venue.state)
+    if key not in grouped_venues:
+      grouped_venues[key] = []
+    grouped_venues[key].append(venue_data)
+
+  # Build the final data structure
+  for (city, state), venues_var in grouped_venues.items():
+    data.append({
+      "city": city,
+      "state": state,
+      "venues": venues_var
+    })
+
+  # Send data to Front End
+  return render_template('pages/venues.html', areas=data,
+    facets=genre_facets(Venue, genres, match), selected_genres=genres, match=match)
+
+# Search Through Venues
+@blueprint.route('/venues/search', methods=['POST']) 
+@replica_reads
+@cache.cached('venues', 'shows')
+def search_venues():
+
+  # Fetch search term from front end
+  search_term=request.form.get('search_term', '')
+
+  # Query venues by name, city or state, best matches first
+  genres, match = requested_genres()
+  venues_in_db = search_records(Venue, search_term, genres, match)
+
+  # Build the response with the count and matched venues
+  response = {
+    "count": len(venues_in_db),
+    "data": []
+  }
+
+  # Create data to send to Front-End
+  for venue in venues_in_db:
+    response["data"].append({
+      "id": venue.id,
+      "name": venue.name,
+      "num_upcoming_shows": venue.upcoming_shows_count
+    })
+
+  # Send to Front-End
+  return render_template('pages/search_venues.html', results=response, search_term=request.form.get('search_term', ''),
+    facets=genre_facets(Venue, genres, match, search_term), selected_genres=genres, match=match)
+
+# Autocomplete venue names for the show form
+@blueprint.route('/venues/autocomplete')
+def autocomplete_venues():
+  prefix = request.args.get('q', '').strip()
+  return jsonify({"data": venue_index.search(prefix) if prefix else []})
+
+# Get Venues by ID
+@blueprint.route('/venues/<int:venue_id>')
+@replica_reads
+@conditional(venue_page_version)
+@cache.cached('venue:{venue_id}')
+def show_venue(venue_id):
+    # Fetch the venue by ID
+    venue = Venue.query.get_or_404(venue_id)
+
+    # Fetch all shows with only the artist columns the page needs
+    shows_in_db = db.session.query(
+        Artist.id, Artist.name, Artist.image_link, Show.start_time
+    ).join(Artist, Show.artist_id == Artist.id).filter(
+        Show.venue_id == venue_id
+    ).order_by(Show.start_time).all()
+
+    # Split shows into past and upcoming
+    now = datetime.now()
+    past_shows_data = []
+    upcoming_shows_data = []
+    for artist_id, artist_name, artist_image_link, start_time in shows_in_db:
+      cache.tag(f'artist:{artist_id}')
+      data = {
+        "artist_id": artist_id,
+        "artist_name": artist_name,
+        "artist_image_link": artist_image_link,
+        "start_time": start_time
+      }
+      if start_time < now:
+        past_shows_data.append(data)
+      else:
+        upcoming_shows_data.append(data)
+
+    # Prepare venue data
+    venue_data = {
+        "id": venue.id,
+        "name": venue.name,
+        "genres": venue.genres,
+        "address": venue.address,
+        "city": venue.city,
+        "state": venue.state,
+        "phone": venue.phone,
+        "website": venue.website,
+        "facebook_link": venue.facebook_link,
+        "seeking_talent": venue.seeking_talent,
+        "seeking_description": venue.seeking_description,
+        "image_link": venue.image_link,
+        "past_shows": past_shows_data,
+        "upcoming_shows": upcoming_shows_data,
+        "past_shows_count": len(past_shows_data),
+        "upcoming_shows_count": len(upcoming_shows_data),
+    }
+
+    return render_template('pages/show_venue.html', venue=venue_data)
+
+#  Create Venue
+@blueprint.route('/venues/create', methods=['GET']) 
+def create_venue_form():
+  form = VenueForm()
+  return render_template('forms/new_venue.html', form=form)
+
+#  Create Venue
+@blueprint.route('/venues/create', methods=['POST']) 
+def create_venue_submission():
+  form = VenueForm(request.form)
+  if form.validate():
+    try:
+      venue = Venue(
+        name=form.name.data,
+        city=form.city.data,
+        state=form.state.data,
+        address=form.address.data,
+        phone=form.phone.data,
+        genres=form.genres.data,
+        website=form.website_link.data,
+        seeking_talent=form.seeking_talent.data,
+        seeking_description=form.seeking_description.data,
+        image_link=form.image_link.data,
+        facebook_link=form.facebook_link.data
+      )
+
+      # Add Venue to the database
+      db.session.add(venue)
+      db.session.commit()
+      cache.invalidate('venues')
+      venue_index.upsert(venue.id, venue.name)
+      flash('Venue successfully listed!')
+
+    except:
+      db.session.rollback()
+      flash('An error occurred. Venue could not be listed.')
+      print(sys.exc_info())
+
+    finally:
+      db.session.close()
+  else:
+    for field_name, error_messages in form.errors.items():
+      for error in error_messages:
+        flash(f"Error in {field_name}: {error}")
+    return redirect(url_for('venues.create_venue_submission'))
+
+  return redirect(url_for('index'))
+
+# Delete Venues by ID
+@blueprint.route('/venues/<venue_id>', methods=['DELETE'])
+def delete_venue(venue_id):
+  try:
+    # Find the venue by ID
+    venue = Venue.query.get(venue_id)
+
+    if not venue:
+      flash(f"Venue with ID {venue_id} not found.", "error")
+      return redirect(url_for('index'))  # Redirect to homepage if venue not found
+
+    # Delete the venue
+    db.session.delete(venue)
+    db.session.commit()
+    cache.invalidate('venues', 'shows', f'venue:{venue_id}')
+    venue_index.remove(venue.id)
+    flash(f"Venue '{venue.name}' was successfully deleted!", "success")
+
+  except Exception as e:
+    db.session.rollback()
+    flash(f"An error occurred while deleting the venue: {str(e)}", "error")
+  finally:
+    db.session.close()
+
+    # Redirect to homepage after deletion
+  return redirect(url_for('index'))
+
+# Edit venue Info
+@blueprint.route('/venues/<int:venue_id>/edit', methods=['GET']) 
+def edit_venue(venue_id):
+
+  # Fetch Venue From DB
+  venue = Venue.query.get(venue_id)
+  form = VenueForm(obj=venue)
+
+  # Pass artist details as a dictionary for rendering the template
+  venue_data = {
+    "id": venue.id,
+    "name": venue.name,
+    "address" : venue.address,
+    "genres": venue.genres,
+    "city": venue.city,
+    "state": venue.state,
+    "phone": venue.phone,
+    "website": venue.website,
+    "facebook_link": venue.facebook_link,
+    "seeking_talent": venue.seeking_talent,
+    "seeking_description": venue.seeking_description,
+    "image_link": venue.image_link,
+  }
+  return render_template('forms/edit_venue.html', form=form, venue=venue_data)
+
+# Edit venue Info
+@blueprint.route('/venues/<int:venue_id>/edit', methods=['POST']) 
+def edit_venue_submission(venue_id):
+  form = VenueForm(request.form)
+  if form.validate():
+    try:
+      # Retrieve data from the form
+      new_name = request.form['name']
+      new_city = request.form['city']
+      new_state = request.form['state']
+      new_address = request.form['address']
+      new_phone = request.form['phone']
+      new_genre = request.form.getlist('genres')
+      new_facebook_link = request.form['facebook_link']
+      new_image_link = request.form['image_link']
+      new_website = request.form['website_link']
+      new_seeking_talent = True if request.form.get('seeking_talent') == 'y' else False
+      new_seeking_description = request.form['seeking_description']
+
+      # Get Venue and update Info
+      venue = Venue.query.get(venue_id)
+      venue.name = new_name
+      venue.city = new_city
+      venue.address = new_address
+      venue.state = new_state
+      venue.phone = new_phone
+      venue.genres = new_genre
+      venue.facebook_link = new_facebook_link
+      venue.image_link = new_image_link
+      venue.website = new_website
+      venue.seeking_talent = new_seeking_talent
+      venue.seeking_description = new_seeking_description
+
+      # commit those changes to DB
+      db.session.commit()
+      flash('Venue Info Was Updated')
+      cache.invalidate('venues', f'venue:{venue_id}')
+      venue_index.upsert(venue_id, new_name)
+
+    except Exception as e:
+      db.session.rollback()
+      flash('An error occurred. Venue could not be updated.')
+      print(f"Error: {e}")
+
+    finally:
+      db.session.close()
+  else:
+    for field_name, error_messages in form.errors.items():
+      for error in error_messages:
+        flash(f"Error in {field_name}: {error}")
+    return redirect(url_for('venues.edit_venue', venue_id=venue_id))
+  return redirect(url_for('venues.show_venue', venue_id=venue_id))
+